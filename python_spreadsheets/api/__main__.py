@@ -1,6 +1,26 @@
+import os
 import sys
+import tempfile
+from pathlib import Path
 
 import uvicorn
+from python_spreadsheets import __version__
+from python_spreadsheets.api.result_cache import RESULT_CACHE_DIRECTORY_VARIABLE
+
+
+def _shared_cache_directory() -> Path:
+    shared_memory = Path("/dev/shm")
+    root = shared_memory if shared_memory.is_dir() else Path(tempfile.gettempdir())
+    return root / f"python-spreadsheets-{__version__}"
+
+
+# Обработчики uvicorn - отдельные процессы, поэтому при запуске нескольких
+# обработчиков кэш результатов по умолчанию размещается в общем каталоге.
+# Каталог переживает перезапуски, поэтому у каждой версии пакета он свой.
+if any(argument.startswith("--workers") for argument in sys.argv[1:]):
+    os.environ.setdefault(
+        RESULT_CACHE_DIRECTORY_VARIABLE, str(_shared_cache_directory())
+    )
 
 sys.argv.insert(1, "python_spreadsheets.api.application:app")
 uvicorn.main()
@@ -1,63 +1,38 @@
-import graphene as gn
-from graphql import GraphQLError, ResolveInfo
-from python_spreadsheets.api.graphene_types import (
-    CellGrapheneType,
-    SpreadsheetGrapheneInput,
-    SpreadsheetGrapheneType,
-)
-from python_spreadsheets.engine.spreadsheet_calculator import SpreadsheetCalculator
+from typing import Optional
+
+from python_spreadsheets.api.columnar import calculate_columnar
+from python_spreadsheets.api.tsv import calculate_tsv
 from starlette.applications import Starlette
-from starlette.graphql import GraphQLApp
 from starlette.routing import Route
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-DEFAULT_ROW_COUNT = 100
-DEFAULT_COLUMN_COUNT = 26
-
-
-class CalculateSpreadsheet(gn.Mutation):
-    class Arguments:
-        input_spreadsheet = SpreadsheetGrapheneInput()
-
-    Output = SpreadsheetGrapheneType
-
-    @staticmethod
-    def mutate(
-        root: None, info: ResolveInfo, input_spreadsheet: SpreadsheetGrapheneInput
-    ) -> "SpreadsheetGrapheneType":
-
-        spreadsheet = SpreadsheetCalculator(
-            columns_number=DEFAULT_COLUMN_COUNT, rows_number=DEFAULT_ROW_COUNT
-        )
 
-        for cell_index, cell in enumerate(input_spreadsheet.cells):
-            try:
-                spreadsheet.add_cell(column=cell.column, row=cell.row, value=cell.value)
-            except ValueError as e:
-                raise GraphQLError(
-                    message=f"Error while adding cell #{cell_index}: {e}",
-                )
+class LazyGraphQLApp:
+    """GraphQL-приложение, загружающее graphene и схему при первом запросе.
 
-        spreadsheet.calculate()
+    Импорт graphene занимает большую часть времени запуска сервера, поэтому
+    обработчики, которые не получают GraphQL-запросов, его не выполняют.
+    """
 
-        calculated_cells = (
-            CellGrapheneType(
-                column=cell_index.column,
-                row=cell_index.row,
-                input=cell.input,
-                output=cell.output,
-            )
-            for cell_index, cell in spreadsheet.cells.items()
-        )
+    _app: Optional[ASGIApp]
 
-        return SpreadsheetGrapheneType(cells=calculated_cells)
+    def __init__(self) -> None:
+        self._app = None
 
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self._app is None:
+            from python_spreadsheets.api.schema import root_schema
+            from starlette.graphql import GraphQLApp
 
-class SpreadsheetMutations(gn.ObjectType):
-    calculate_spreadsheet = CalculateSpreadsheet.Field()
+            self._app = GraphQLApp(schema=root_schema)
 
+        await self._app(scope, receive, send)
 
-root_schema = gn.Schema(mutation=SpreadsheetMutations)
 
-routes = [Route("/graphql", GraphQLApp(schema=root_schema))]
+routes = [
+    Route("/graphql", LazyGraphQLApp()),
+    Route("/columnar", calculate_columnar, methods=["POST"]),
+    Route("/tsv", calculate_tsv, methods=["POST"]),
+]
 
 app = Starlette(debug=True, routes=routes)
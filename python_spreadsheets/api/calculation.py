@@ -0,0 +1,133 @@
+import os
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from python_spreadsheets.api.recording import (
+    RecordingSpreadsheetCalculator,
+    create_session_recorder,
+)
+from python_spreadsheets.api.result_cache import (
+    RESULT_CACHE_DIRECTORY_VARIABLE,
+    CalculatedCell,
+    FileBackend,
+    InputCell,
+    MemoryBackend,
+    ResultCache,
+)
+from python_spreadsheets.engine.profiler import FormulaProfiler
+from python_spreadsheets.engine.spreadsheet_calculator import SpreadsheetCalculator
+from python_spreadsheets.engine.spreadsheet_helpers import (
+    MAX_COLUMNS_NUMBER,
+    MAX_ROWS_NUMBER,
+)
+
+DEFAULT_ROW_COUNT = MAX_ROWS_NUMBER
+DEFAULT_COLUMN_COUNT = MAX_COLUMNS_NUMBER
+
+RESULT_CACHE_SIZE = 1024
+
+
+def create_result_cache() -> ResultCache:
+    """Создание кэша результатов.
+
+    Если задана переменная окружения ``PYTHON_SPREADSHEETS_CACHE_DIR``,
+    результаты хранятся в этом каталоге и доступны всем процессам сервера,
+    иначе - в памяти процесса.
+    """
+    directory = os.environ.get(RESULT_CACHE_DIRECTORY_VARIABLE)
+    if directory:
+        backend = FileBackend(directory=Path(directory), max_size=RESULT_CACHE_SIZE)
+        return ResultCache(backend=backend)
+
+    return ResultCache(backend=MemoryBackend(max_size=RESULT_CACHE_SIZE))
+
+
+result_cache = create_result_cache()
+
+session_recorder = create_session_recorder()
+
+
+def create_spreadsheet(
+    profiler: Optional[FormulaProfiler] = None,
+) -> SpreadsheetCalculator:
+    """Создание таблицы для расчета запроса.
+
+    Если задана переменная окружения ``PYTHON_SPREADSHEETS_RECORDING_PATH``,
+    операции с таблицей записываются в журнал для воспроизведения.
+
+    Args:
+        profiler: профилировщик расчета формул таблицы
+    """
+    if session_recorder is not None:
+        return RecordingSpreadsheetCalculator(
+            columns_number=DEFAULT_COLUMN_COUNT,
+            rows_number=DEFAULT_ROW_COUNT,
+            recorder=session_recorder,
+            profiler=profiler,
+        )
+
+    return SpreadsheetCalculator(
+        columns_number=DEFAULT_COLUMN_COUNT,
+        rows_number=DEFAULT_ROW_COUNT,
+        profiler=profiler,
+    )
+
+
+def _calculate(
+    cells: Sequence[InputCell], profiler: Optional[FormulaProfiler] = None
+) -> List[CalculatedCell]:
+    spreadsheet = create_spreadsheet(profiler=profiler)
+
+    for cell_index, (column, row, value) in enumerate(cells):
+        try:
+            spreadsheet.add_cell(column=column, row=row, value=value)
+        except ValueError as e:
+            raise ValueError(f"Error while adding cell #{cell_index}: {e}")
+
+    spreadsheet.calculate()
+
+    return [
+        (cell_index.column, cell_index.row, cell.input, str(cell.output))
+        for cell_index, cell in spreadsheet.cells.items()
+    ]
+
+
+def calculate_cells(
+    cells: Sequence[InputCell],
+    profiler: Optional[FormulaProfiler] = None,
+    use_cache: bool = True,
+) -> List[CalculatedCell]:
+    """Расчет таблицы из входных ячеек.
+
+    Повторные расчеты одинаковых таблиц обслуживаются из ``result_cache``.
+    Профилируемый расчет выполняется всегда и в кэш не попадает. Запросы,
+    обслуженные из кэша, тоже записываются в журнал сеансов.
+
+    Args:
+        cells: тройки (столбец, строка, значение) входных ячеек
+        profiler: профилировщик расчета формул
+        use_cache: использовать ли кэш результатов
+
+    Returns: Четверки (столбец, строка, вход, выход) рассчитанных ячеек
+    Raises:
+        ValueError: при некорректной входной ячейке
+    """
+    if profiler is not None or not use_cache:
+        return _calculate(cells, profiler=profiler)
+
+    key = result_cache.key(
+        cells, columns_number=DEFAULT_COLUMN_COUNT, rows_number=DEFAULT_ROW_COUNT
+    )
+
+    calculated_cells = result_cache.get(key)
+    if calculated_cells is None:
+        calculated_cells = _calculate(cells)
+        result_cache.put(key, calculated_cells)
+    elif session_recorder is not None:
+        session_recorder.record_sheet(
+            columns_number=DEFAULT_COLUMN_COUNT,
+            rows_number=DEFAULT_ROW_COUNT,
+            cells=cells,
+        )
+
+    return calculated_cells
@@ -0,0 +1,199 @@
+"""Компактный колоночный формат обмена таблицами.
+
+Ячейки передаются параллельными массивами, а все строки (имена столбцов,
+входные и выходные значения) хранятся один раз в общей таблице строк::
+
+    {
+        "strings": ["a", "1", "lambda: a1 * 2"],
+        "columns": [0, 0],
+        "rows": [1, 2],
+        "values": [1, 2]
+    }
+
+В ответе вместо ``values`` передаются массивы ``inputs`` и ``outputs``.
+
+С параметром запроса ``profile`` (``/columnar?profile=1``) расчет выполняется
+мимо кэша результатов, а в ответ добавляется отчет ``profile`` о самых
+затратных формулах и их стеки в свернутом формате (``folded``).
+Значение параметра больше единицы задает размер отчета.
+
+С параметром ``cache=0`` расчет выполняется мимо кэша результатов, например
+при воспроизведении журналов сеансов.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from python_spreadsheets.api.calculation import calculate_cells
+from python_spreadsheets.api.result_cache import CalculatedCell, InputCell
+from python_spreadsheets.engine.profiler import DEFAULT_TOP_SIZE, FormulaProfiler
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+
+class StringTable:
+    """Таблица строк, хранящая каждую уникальную строку один раз."""
+
+    _indexes: Dict[str, int]
+    _strings: List[str]
+
+    def __init__(self) -> None:
+        self._indexes = {}
+        self._strings = []
+
+    def add(self, value: str) -> int:
+        index = self._indexes.get(value)
+        if index is None:
+            index = len(self._strings)
+            self._indexes[value] = index
+            self._strings.append(value)
+        return index
+
+    @property
+    def strings(self) -> List[str]:
+        return self._strings
+
+
+def _get_array(payload: Dict[str, Any], name: str, item_type: type) -> List[Any]:
+    try:
+        array = payload[name]
+    except KeyError:
+        raise ValueError(f"Payload must contain '{name}' array")
+
+    if not isinstance(array, list) or not all(
+        isinstance(item, item_type) and not isinstance(item, bool) for item in array
+    ):
+        raise ValueError(f"Array {name} must contain only {item_type.__name__} items")
+
+    return array
+
+
+def decode_columnar(payload: Any) -> List[InputCell]:
+    """Преобразование колоночного представления в список входных ячеек.
+
+    Args:
+        payload: разобранное тело запроса
+
+    Returns: Тройки (столбец, строка, значение) входных ячеек
+    Raises:
+        ValueError: при некорректной структуре запроса
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("Payload must be an object")
+
+    strings = _get_array(payload, "strings", str)
+    columns = _get_array(payload, "columns", int)
+    rows = _get_array(payload, "rows", int)
+    values = _get_array(payload, "values", int)
+
+    if not len(columns) == len(rows) == len(values):
+        raise ValueError("Arrays columns, rows and values must have the same length")
+
+    if not all(0 <= index < len(strings) for index in columns + values):
+        raise ValueError("Columns and values must be indexes in strings array")
+
+    return [
+        (strings[column], row, strings[value])
+        for column, row, value in zip(columns, rows, values)
+    ]
+
+
+def encode_columnar_input(cells: Iterable[InputCell]) -> Dict[str, List]:
+    """Преобразование входных ячеек в колоночное представление запроса.
+
+    Args:
+        cells: тройки (столбец, строка, значение) входных ячеек
+
+    Returns: Колоночное представление, принимаемое ``decode_columnar``
+    """
+    string_table = StringTable()
+
+    columns = []
+    rows = []
+    values = []
+
+    for column, row, value in cells:
+        columns.append(string_table.add(column))
+        rows.append(row)
+        values.append(string_table.add(value))
+
+    return {
+        "strings": string_table.strings,
+        "columns": columns,
+        "rows": rows,
+        "values": values,
+    }
+
+
+def encode_columnar(cells: Iterable[CalculatedCell]) -> Dict[str, List]:
+    """Преобразование рассчитанных ячеек в колоночное представление.
+
+    Args:
+        cells: четверки (столбец, строка, вход, выход) рассчитанных ячеек
+
+    Returns: Колоночное представление ячеек
+    """
+    string_table = StringTable()
+
+    columns = []
+    rows = []
+    inputs = []
+    outputs = []
+
+    for column, row, input_, output in cells:
+        columns.append(string_table.add(column))
+        rows.append(row)
+        inputs.append(string_table.add(input_))
+        outputs.append(string_table.add(output))
+
+    return {
+        "strings": string_table.strings,
+        "columns": columns,
+        "rows": rows,
+        "inputs": inputs,
+        "outputs": outputs,
+    }
+
+
+def get_profile_size(value: Optional[str]) -> Optional[int]:
+    """Размер отчета профилировщика по значению параметра ``profile``.
+
+    Returns: Размер отчета или None, если профилирование не запрошено
+    Raises:
+        ValueError: при нечисловом или отрицательном значении параметра
+    """
+    if value is None or value in ("", "0"):
+        return None
+
+    try:
+        size = int(value)
+    except ValueError:
+        raise ValueError("Parameter profile must be a number")
+
+    if size < 1:
+        raise ValueError("Parameter profile must be a positive number")
+
+    return DEFAULT_TOP_SIZE if size == 1 else size
+
+
+async def calculate_columnar(request: Request) -> JSONResponse:
+    try:
+        profile_size = get_profile_size(request.query_params.get("profile"))
+        profiler = FormulaProfiler() if profile_size is not None else None
+        use_cache = request.query_params.get("cache") != "0"
+
+        cells = decode_columnar(await request.json())
+        calculated_cells = await run_in_threadpool(
+            calculate_cells, cells, profiler=profiler, use_cache=use_cache
+        )
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+    response: Dict[str, Any] = encode_columnar(calculated_cells)
+    if profiler is not None and profile_size is not None:
+        response["profile"] = {
+            **profiler.as_dict(size=profile_size),
+            "folded": list(profiler.folded()),
+        }
+
+    return JSONResponse(response)
@@ -32,3 +32,18 @@ class SpreadsheetGrapheneType(gn.ObjectType):
         name = "Spreadsheet"
 
     cells = gn.NonNull(gn.List(gn.NonNull(CellGrapheneType)))
+
+
+class SpreadsheetResultGrapheneType(gn.ObjectType):
+    class Meta:
+        name = "SpreadsheetResult"
+
+    spreadsheet = gn.Field(SpreadsheetGrapheneType)
+    error = gn.String()
+
+
+class SpreadsheetBatchGrapheneType(gn.ObjectType):
+    class Meta:
+        name = "SpreadsheetBatch"
+
+    results = gn.NonNull(gn.List(gn.NonNull(SpreadsheetResultGrapheneType)))
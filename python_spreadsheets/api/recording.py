@@ -0,0 +1,139 @@
+"""Запись сеансов расчета таблиц для последующего воспроизведения.
+
+Журнал - текстовый файл, в который только дописываются строки, по одному
+событию на строку в виде JSON-массива::
+
+    [1602512345123, "4242:1", "create", 16384, 1048576]
+    [1602512345124, "4242:1", "add_cell", "a", 1, "lambda: b1 * 2"]
+    [1602512345130, "4242:1", "calculate"]
+
+Первый элемент - время события в миллисекундах, второй - идентификатор
+таблицы (номер процесса и порядковый номер таблицы в процессе), далее -
+операция и ее аргументы. Каждое событие записывается одним системным вызовом
+в файл, открытый на дозапись, поэтому журнал могут одновременно вести
+несколько процессов сервера.
+"""
+
+import itertools
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from python_spreadsheets.engine.profiler import FormulaProfiler
+from python_spreadsheets.engine.spreadsheet_calculator import SpreadsheetCalculator
+from python_spreadsheets.engine.types import CalculationResult, CellIndex
+
+RECORDING_PATH_VARIABLE = "PYTHON_SPREADSHEETS_RECORDING_PATH"
+
+CREATE = "create"
+ADD_CELL = "add_cell"
+CALCULATE = "calculate"
+
+
+class Event(NamedTuple):
+    time: int
+    sheet: str
+    operation: str
+    arguments: List[Any]
+
+
+class SessionRecorder:
+    """Журнал операций с таблицами."""
+
+    _descriptor: int
+    _sheet_numbers: Iterator[int]
+
+    def __init__(self, path: Path):
+        self._descriptor = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._sheet_numbers = itertools.count(1)
+
+    def new_sheet(self) -> str:
+        return f"{os.getpid()}:{next(self._sheet_numbers)}"
+
+    def record(self, sheet: str, operation: str, *arguments: Any) -> None:
+        line = json.dumps(
+            [int(time.time() * 1000), sheet, operation, *arguments],
+            separators=(",", ":"),
+            ensure_ascii=False,
+        )
+        os.write(self._descriptor, f"{line}\n".encode())
+
+    def record_sheet(
+        self,
+        columns_number: int,
+        rows_number: int,
+        cells: Sequence[Tuple[str, int, str]],
+    ) -> None:
+        """Запись сеанса таблицы, расчет которой выполнен без ``SpreadsheetCalculator``.
+
+        Используется для запросов, обслуженных из кэша результатов, чтобы журнал
+        содержал весь поток запросов.
+        """
+        sheet = self.new_sheet()
+        self.record(sheet, CREATE, columns_number, rows_number)
+        for column, row, value in cells:
+            self.record(sheet, ADD_CELL, column, row, value)
+        self.record(sheet, CALCULATE)
+
+    def close(self) -> None:
+        os.close(self._descriptor)
+
+
+def create_session_recorder() -> Optional[SessionRecorder]:
+    """Создание журнала по переменной окружения ``RECORDING_PATH_VARIABLE``."""
+    path = os.environ.get(RECORDING_PATH_VARIABLE)
+    if path:
+        return SessionRecorder(Path(path))
+    return None
+
+
+def read_events(path: Path) -> Iterator[Event]:
+    """Чтение событий журнала в порядке записи.
+
+    Raises:
+        ValueError: при некорректной строке журнала
+    """
+    with path.open("r") as log_file:
+        for line_number, line in enumerate(log_file, start=1):
+            if not line.strip():
+                continue
+            try:
+                event_time, sheet, operation, *arguments = json.loads(line)
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid event at line {line_number}")
+            yield Event(
+                time=event_time, sheet=sheet, operation=operation, arguments=arguments
+            )
+
+
+class RecordingSpreadsheetCalculator(SpreadsheetCalculator):
+    """Таблица, записывающая свои операции в журнал."""
+
+    _recorder: SessionRecorder
+    _sheet: str
+
+    def __init__(
+        self,
+        columns_number: int,
+        rows_number: int,
+        recorder: SessionRecorder,
+        profiler: Optional[FormulaProfiler] = None,
+    ):
+        super().__init__(
+            columns_number=columns_number, rows_number=rows_number, profiler=profiler
+        )
+        self._recorder = recorder
+        self._sheet = recorder.new_sheet()
+        self._recorder.record(self._sheet, CREATE, columns_number, rows_number)
+
+    def add_cell(self, column: str, row: int, value: str) -> None:
+        self._recorder.record(self._sheet, ADD_CELL, column, row, value)
+        super().add_cell(column=column, row=row, value=value)
+
+    def calculate(
+        self, time_budget: Optional[float] = None, priority: Iterable[CellIndex] = ()
+    ) -> CalculationResult:
+        self._recorder.record(self._sheet, CALCULATE)
+        return super().calculate(time_budget=time_budget, priority=priority)
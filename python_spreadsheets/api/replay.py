@@ -0,0 +1,335 @@
+"""Воспроизведение журналов сеансов для нагрузочного тестирования.
+
+Журнал, записанный ``SessionRecorder``, воспроизводится либо напрямую
+на ``SpreadsheetCalculator``, либо запросами к ASGI-приложению сервера
+(каждый расчет таблицы - запрос ``/columnar`` со всеми ее ячейками).
+Сеансы разных таблиц выполняются параллельно, операции одной таблицы -
+в порядке записи; при ненулевой скорости соблюдаются записанные интервалы
+между событиями.
+
+Журнал содержит все запросы, в том числе обслуженные из кэша результатов.
+По умолчанию запросы воспроизводятся мимо кэша (``/columnar?cache=0``),
+то есть измеряется стоимость расчета; с ``use_cache`` измеряется работа
+сервера вместе с кэшем, заполняемым в ходе воспроизведения.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import resource
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from python_spreadsheets.api.columnar import encode_columnar_input
+from python_spreadsheets.api.recording import (
+    ADD_CELL,
+    CALCULATE,
+    CREATE,
+    Event,
+    read_events,
+)
+from python_spreadsheets.api.result_cache import InputCell
+from python_spreadsheets.engine.spreadsheet_calculator import SpreadsheetCalculator
+from starlette.types import ASGIApp, Message
+
+PERCENTILES = (50, 90, 99)
+
+Latencies = List[Tuple[str, float]]
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    """Перцентиль по методу ближайшего ранга."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def get_peak_memory() -> int:
+    """Пиковый размер резидентной памяти процесса в байтах."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class ReplayReport(NamedTuple):
+    duration: float
+    latencies: Dict[str, List[float]]
+    errors: int
+    peak_memory: int
+
+    @property
+    def operations(self) -> int:
+        return sum(len(latencies) for latencies in self.latencies.values())
+
+    @property
+    def throughput(self) -> float:
+        return self.operations / self.duration if self.duration else 0.0
+
+    def format(self) -> str:
+        lines = [
+            f"operations: {self.operations} in {self.duration:.3f} s "
+            f"({self.throughput:.1f} ops/s), errors: {self.errors}"
+        ]
+        for operation, latencies in self.latencies.items():
+            values = ", ".join(
+                f"p{percent} {percentile(latencies, percent) * 1000:.3f} ms"
+                for percent in PERCENTILES
+            )
+            lines.append(f"{operation} latency: {values}")
+        lines.append(f"peak memory: {self.peak_memory / 2 ** 20:.1f} MiB")
+        return "\n".join(lines)
+
+
+def group_sessions(events: Sequence[Event]) -> List[List[Event]]:
+    """События, сгруппированные по таблицам в порядке их появления."""
+    sessions: Dict[str, List[Event]] = {}
+    for event in events:
+        sessions.setdefault(event.sheet, []).append(event)
+    return list(sessions.values())
+
+
+def _create_report(
+    started: float, results: Sequence[Tuple[Latencies, int]]
+) -> ReplayReport:
+    duration = time.perf_counter() - started
+
+    latencies: Dict[str, List[float]] = {}
+    errors = 0
+    for session_latencies, session_errors in results:
+        for operation, latency in session_latencies:
+            latencies.setdefault(operation, []).append(latency)
+        errors += session_errors
+
+    return ReplayReport(
+        duration=duration,
+        latencies=latencies,
+        errors=errors,
+        peak_memory=get_peak_memory(),
+    )
+
+
+def _get_delay(event: Event, first_time: int, started: float, speed: float) -> float:
+    """Время до события по расписанию записи; при нулевой скорости - ноль."""
+    if speed <= 0:
+        return 0.0
+    scheduled = (event.time - first_time) / 1000 / speed
+    return scheduled - (time.perf_counter() - started)
+
+
+def _apply_event(
+    spreadsheet: Optional[SpreadsheetCalculator], event: Event
+) -> SpreadsheetCalculator:
+    if event.operation == CREATE:
+        return SpreadsheetCalculator(*event.arguments)
+    if spreadsheet is None:
+        raise ValueError(f"Spreadsheet {event.sheet} is not created")
+    if event.operation == ADD_CELL:
+        spreadsheet.add_cell(*event.arguments)
+    elif event.operation == CALCULATE:
+        spreadsheet.calculate()
+    else:
+        raise ValueError(f"Unknown operation {event.operation}")
+    return spreadsheet
+
+
+def replay_calculator(
+    events: Sequence[Event], speed: float = 0.0, concurrency: int = 1
+) -> ReplayReport:
+    """Воспроизведение журнала на ``SpreadsheetCalculator``.
+
+    Args:
+        events: события журнала
+        speed: множитель скорости относительно записи, 0 - без ожидания
+        concurrency: количество одновременно воспроизводимых таблиц
+
+    Returns: Отчет с задержками каждой операции
+    """
+    first_time = events[0].time if events else 0
+    started = time.perf_counter()
+
+    def replay_session(session: List[Event]) -> Tuple[Latencies, int]:
+        spreadsheet = None
+        latencies = []
+        errors = 0
+        for event in session:
+            delay = _get_delay(event, first_time, started=started, speed=speed)
+            if delay > 0:
+                time.sleep(delay)
+
+            operation_started = time.perf_counter()
+            try:
+                spreadsheet = _apply_event(spreadsheet, event)
+            except ValueError:
+                errors += 1
+            latencies.append((event.operation, time.perf_counter() - operation_started))
+        return latencies, errors
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(replay_session, group_sessions(events)))
+
+    return _create_report(started, results)
+
+
+async def _post(app: ASGIApp, path: str, body: bytes, query_string: bytes = b"") -> int:
+    """Выполнение POST-запроса к ASGI-приложению без сетевого взаимодействия.
+
+    Returns: Код ответа
+    """
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query_string,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+        "client": ("replay", 0),
+        "server": ("replay", 80),
+    }
+    request_messages = [{"type": "http.request", "body": body, "more_body": False}]
+    status = 0
+
+    async def receive() -> Message:
+        if request_messages:
+            return request_messages.pop()
+        await asyncio.Event().wait()  # клиент не отключается до конца ответа
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def _replay_application(
+    events: Sequence[Event],
+    app: ASGIApp,
+    speed: float,
+    concurrency: int,
+    use_cache: bool,
+) -> ReplayReport:
+    first_time = events[0].time if events else 0
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(concurrency)
+    query_string = b"" if use_cache else b"cache=0"
+
+    async def replay_session(session: List[Event]) -> Tuple[Latencies, int]:
+        cells: List[InputCell] = []
+        latencies = []
+        errors = 0
+        async with semaphore:
+            for event in session:
+                delay = _get_delay(event, first_time, started=started, speed=speed)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                if event.operation == CREATE:
+                    cells = []
+                elif event.operation == ADD_CELL:
+                    column, row, value = event.arguments
+                    cells.append((column, row, value))
+                elif event.operation == CALCULATE:
+                    body = json.dumps(encode_columnar_input(cells)).encode()
+                    request_started = time.perf_counter()
+                    status = await _post(
+                        app, "/columnar", body, query_string=query_string
+                    )
+                    latencies.append(
+                        (event.operation, time.perf_counter() - request_started)
+                    )
+                    if status != 200:
+                        errors += 1
+        return latencies, errors
+
+    results = await asyncio.gather(
+        *(replay_session(session) for session in group_sessions(events))
+    )
+
+    return _create_report(started, results)
+
+
+def replay_application(
+    events: Sequence[Event],
+    app: ASGIApp,
+    speed: float = 0.0,
+    concurrency: int = 1,
+    use_cache: bool = False,
+) -> ReplayReport:
+    """Воспроизведение журнала запросами к ASGI-приложению.
+
+    Args:
+        events: события журнала
+        app: приложение сервера
+        speed: множитель скорости относительно записи, 0 - без ожидания
+        concurrency: количество одновременно воспроизводимых таблиц
+        use_cache: выполнять ли запросы через кэш результатов
+
+    Returns: Отчет с задержками запросов расчета
+    """
+    return asyncio.run(
+        _replay_application(
+            events,
+            app=app,
+            speed=speed,
+            concurrency=concurrency,
+            use_cache=use_cache,
+        )
+    )
+
+
+def main(arguments: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Replay recorded spreadsheet sessions and report latencies"
+    )
+    parser.add_argument("log", type=Path, help="session log to replay")
+    parser.add_argument(
+        "--target",
+        choices=("calculator", "application"),
+        default="calculator",
+        help="replay against the calculator or the ASGI application",
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=0.0,
+        help="speed relative to the recording, 0 replays without delays",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=1, help="sessions replayed at once"
+    )
+    parser.add_argument(
+        "--use-cache",
+        action="store_true",
+        help="let application requests hit the result cache",
+    )
+    options = parser.parse_args(arguments)
+
+    events = list(read_events(options.log))
+
+    if options.target == "application":
+        from python_spreadsheets.api.application import app
+
+        report = replay_application(
+            events,
+            app=app,
+            speed=options.speed,
+            concurrency=options.concurrency,
+            use_cache=options.use_cache,
+        )
+    else:
+        report = replay_calculator(
+            events, speed=options.speed, concurrency=options.concurrency
+        )
+
+    print(report.format())
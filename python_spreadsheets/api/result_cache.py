@@ -0,0 +1,188 @@
+"""Кэш результатов расчета таблиц, адресуемый по содержимому."""
+
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from python_spreadsheets import __version__
+
+InputCell = Tuple[str, int, str]
+CalculatedCell = Tuple[str, int, str, str]
+
+RESULT_CACHE_FORMAT_VERSION = 1
+
+RESULT_CACHE_DIRECTORY_VARIABLE = "PYTHON_SPREADSHEETS_CACHE_DIR"
+
+
+class ResultCacheBackend(ABC):
+    """Хранилище рассчитанных таблиц."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[List[CalculatedCell]]:
+        pass
+
+    @abstractmethod
+    def put(self, key: str, cells: List[CalculatedCell]) -> None:
+        pass
+
+
+class MemoryBackend(ResultCacheBackend):
+    """Хранилище в памяти процесса с вытеснением давно не использованных записей."""
+
+    _max_size: int
+    _entries: "OrderedDict[str, List[CalculatedCell]]"
+    _lock: threading.Lock
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[List[CalculatedCell]]:
+        with self._lock:
+            cells = self._entries.get(key)
+            if cells is not None:
+                self._entries.move_to_end(key)
+            return cells
+
+    def put(self, key: str, cells: List[CalculatedCell]) -> None:
+        with self._lock:
+            self._entries[key] = cells
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+
+class FileBackend(ResultCacheBackend):
+    """Хранилище в локальном каталоге, по одному файлу на таблицу.
+
+    При превышении размера удаляются файлы с самым старым временем доступа.
+
+    Каталог может одновременно использоваться несколькими процессами, например
+    обработчиками uvicorn в каталоге на tmpfs (``/dev/shm``): записи заменяются
+    атомарно, вытеснение выполняет один процесс под файловой блокировкой,
+    а записи другой версии формата считаются отсутствующими.
+    """
+
+    _directory: Path
+    _max_size: int
+
+    def __init__(self, directory: Path, max_size: int):
+        self._directory = directory
+        self._max_size = max_size
+        self._directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self._directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[List[CalculatedCell]]:
+        path = self._path(key)
+        try:
+            with path.open("r") as cache_file:
+                entry = json.load(cache_file)
+            os.utime(path)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        if (
+            not isinstance(entry, dict)
+            or entry.get("version") != RESULT_CACHE_FORMAT_VERSION
+            or "cells" not in entry
+        ):
+            return None
+
+        cells = entry["cells"]
+
+        return [(column, row, input_, output) for column, row, input_, output in cells]
+
+    def put(self, key: str, cells: List[CalculatedCell]) -> None:
+        entry = {"version": RESULT_CACHE_FORMAT_VERSION, "cells": cells}
+
+        descriptor, temporary_path = tempfile.mkstemp(
+            dir=self._directory, prefix=f"{key}.", suffix=".tmp"
+        )
+        with os.fdopen(descriptor, "w") as cache_file:
+            json.dump(entry, cache_file, separators=(",", ":"))
+        os.replace(temporary_path, self._path(key))
+
+        self._evict()
+
+    def _evict(self) -> None:
+        with (self._directory / ".lock").open("w") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return  # вытеснение уже выполняет другой процесс
+
+            self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        entries = []
+        for path in self._directory.glob("*.json"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                pass
+
+        entries.sort()
+        for _, path in entries[: max(len(entries) - self._max_size, 0)]:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class ResultCache:
+    """Кэш рассчитанных таблиц с учетом попаданий и промахов."""
+
+    _backend: ResultCacheBackend
+    _lock: threading.Lock
+
+    hits: int
+    misses: int
+
+    def __init__(self, backend: ResultCacheBackend):
+        self._backend = backend
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(cells: Sequence[InputCell], columns_number: int, rows_number: int) -> str:
+        """Канонический ключ таблицы.
+
+        Порядок ячеек входит в ключ, так как от него зависят порядок ячеек
+        в результате и тексты ошибок. Версия пакета входит в ключ, чтобы
+        общий каталог кэша, переживший обновление, не отдавал результаты
+        предыдущей версии движка.
+        """
+        canonical = json.dumps(
+            [__version__, columns_number, rows_number, cells],
+            separators=(",", ":"),
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[List[CalculatedCell]]:
+        cells = self._backend.get(key)
+        with self._lock:
+            if cells is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return cells
+
+    def put(self, key: str, cells: List[CalculatedCell]) -> None:
+        self._backend.put(key, cells)
+
+    @property
+    def hit_rate(self) -> float:
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
@@ -0,0 +1,88 @@
+from typing import List
+
+import graphene as gn
+from graphql import GraphQLError, ResolveInfo
+from python_spreadsheets.api.calculation import calculate_cells
+from python_spreadsheets.api.graphene_types import (
+    CellGrapheneType,
+    SpreadsheetBatchGrapheneType,
+    SpreadsheetGrapheneInput,
+    SpreadsheetGrapheneType,
+    SpreadsheetResultGrapheneType,
+)
+
+
+def calculate_spreadsheet(
+    input_spreadsheet: SpreadsheetGrapheneInput,
+) -> SpreadsheetGrapheneType:
+    """Расчет одной таблицы.
+
+    Args:
+        input_spreadsheet: входные ячейки таблицы
+
+    Returns: Таблица с рассчитанными ячейками
+    Raises:
+        ValueError: при некорректной входной ячейке
+    """
+    cells = [(cell.column, cell.row, cell.value) for cell in input_spreadsheet.cells]
+
+    calculated_cells = [
+        CellGrapheneType(column=column, row=row, input=input_, output=output)
+        for column, row, input_, output in calculate_cells(cells)
+    ]
+
+    return SpreadsheetGrapheneType(cells=calculated_cells)
+
+
+def _calculate_batch_item(
+    input_spreadsheet: SpreadsheetGrapheneInput,
+) -> SpreadsheetResultGrapheneType:
+    try:
+        return SpreadsheetResultGrapheneType(
+            spreadsheet=calculate_spreadsheet(input_spreadsheet)
+        )
+    except ValueError as e:
+        return SpreadsheetResultGrapheneType(error=str(e))
+
+
+class CalculateSpreadsheet(gn.Mutation):
+    class Arguments:
+        input_spreadsheet = SpreadsheetGrapheneInput()
+
+    Output = SpreadsheetGrapheneType
+
+    @staticmethod
+    def mutate(
+        root: None, info: ResolveInfo, input_spreadsheet: SpreadsheetGrapheneInput
+    ) -> "SpreadsheetGrapheneType":
+        try:
+            return calculate_spreadsheet(input_spreadsheet)
+        except ValueError as e:
+            raise GraphQLError(message=str(e))
+
+
+class CalculateSpreadsheets(gn.Mutation):
+    class Arguments:
+        inputs = gn.NonNull(gn.List(gn.NonNull(SpreadsheetGrapheneInput)))
+
+    Output = SpreadsheetBatchGrapheneType
+
+    @staticmethod
+    def mutate(
+        root: None, info: ResolveInfo, inputs: List[SpreadsheetGrapheneInput]
+    ) -> "SpreadsheetBatchGrapheneType":
+        # расчет - работа интерпретатора под GIL, потоки его не ускоряют;
+        # выигрыш пакета - в одном запросе и одном разборе документа
+        results = [
+            _calculate_batch_item(input_spreadsheet) for input_spreadsheet in inputs
+        ]
+
+        return SpreadsheetBatchGrapheneType(results=results)
+
+
+class SpreadsheetMutations(gn.ObjectType):
+    calculate_spreadsheet = CalculateSpreadsheet.Field()
+    calculate_spreadsheets = CalculateSpreadsheets.Field()
+
+
+root_schema = gn.Schema(mutation=SpreadsheetMutations)
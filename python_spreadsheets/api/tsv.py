@@ -0,0 +1,121 @@
+"""Потоковый расчет таблиц в формате TSV.
+
+Тело запроса - таблица в том же формате, что и файлы ``load_from_tsv``:
+первая строка содержит имена столбцов, первый столбец - номера строк.
+Ячейки добавляются в таблицу по мере получения тела запроса, поэтому формулы
+разбираются и компилируются до окончания загрузки, а запрос целиком в памяти
+не хранится.
+
+В ответе построчно передается таблица того же вида с рассчитанными значениями.
+"""
+
+import codecs
+import csv
+import io
+from itertools import groupby
+from typing import AsyncGenerator, AsyncIterator, Iterator, List
+
+from python_spreadsheets.api.calculation import create_spreadsheet
+from python_spreadsheets.engine.loaders import TsvParser
+from python_spreadsheets.engine.spreadsheet_calculator import SpreadsheetCalculator
+from python_spreadsheets.engine.spreadsheet_helpers import ColumnHelper
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+
+TSV_MEDIA_TYPE = "text/tab-separated-values"
+
+
+async def read_lines(
+    chunks: AsyncIterator[bytes],
+) -> AsyncGenerator[List[str], None]:
+    """Разбиение потока байтов в кодировке UTF-8 на строки.
+
+    Args:
+        chunks: части тела запроса
+
+    Returns: Списки завершенных строк, полученных из очередной части
+    Raises:
+        ValueError: при некорректной кодировке
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    tail = ""
+
+    async for chunk in chunks:
+        lines = (tail + decoder.decode(chunk)).split("\n")
+        tail = lines.pop()
+        if lines:
+            yield [line + "\n" for line in lines]
+
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield [tail]
+
+
+def format_tsv(
+    spreadsheet: SpreadsheetCalculator, columns_number: int
+) -> Iterator[str]:
+    """Построчное представление рассчитанной таблицы в формате TSV.
+
+    Args:
+        spreadsheet: рассчитанная таблица, ячейки которой добавлены по строкам
+        columns_number: количество столбцов в заголовке
+
+    Returns: Строки таблицы вместе с символами перевода строки
+    """
+    buffer = io.StringIO()
+    tsv_writer = csv.writer(buffer, delimiter="\t", lineterminator="\n")
+
+    def write_row(row: List[str]) -> str:
+        buffer.seek(0)
+        buffer.truncate()
+        tsv_writer.writerow(row)
+        return buffer.getvalue()
+
+    yield write_row(
+        [""]
+        + [
+            ColumnHelper.number_to_column(column_index)
+            for column_index in range(1, columns_number + 1)
+        ]
+    )
+
+    for row, cells in groupby(spreadsheet.cells.items(), key=lambda item: item[0].row):
+        yield write_row([str(row)] + [str(cell.output) for _, cell in cells])
+
+
+async def calculate_tsv(request: Request) -> Response:
+    spreadsheet = create_spreadsheet()
+    tsv_parser = TsvParser()
+    columns_number = 0
+
+    chunks = request.stream()
+    lines_stream = read_lines(chunks)
+    try:
+        async for lines in lines_stream:
+            for cell_index, cell in tsv_parser.parse(lines):
+                try:
+                    spreadsheet.add_cell(
+                        column=cell_index.column, row=cell_index.row, value=cell.input
+                    )
+                except ValueError as e:
+                    raise ValueError(
+                        f"Error while adding cell {cell_index.column}"
+                        f"{cell_index.row}: {e}"
+                    )
+                columns_number = max(
+                    columns_number, ColumnHelper.column_to_number(cell_index.column)
+                )
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    finally:
+        # при ошибке генераторы остаются незавершенными, закрываем их явно
+        await lines_stream.aclose()
+        await chunks.aclose()
+
+    await run_in_threadpool(spreadsheet.calculate)
+
+    return StreamingResponse(
+        format_tsv(spreadsheet, columns_number=columns_number),
+        media_type=TSV_MEDIA_TYPE,
+    )
@@ -0,0 +1,38 @@
+"""Движок расчета таблиц.
+
+Подмодули загружаются при первом обращении к экспортируемым из пакета именам.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from python_spreadsheets.engine.calculation_context import (  # noqa: F401
+        CalculationContext,
+    )
+    from python_spreadsheets.engine.formula_calculator import (  # noqa: F401
+        FormulaCalculator,
+    )
+    from python_spreadsheets.engine.loaders import load_from_tsv  # noqa: F401
+    from python_spreadsheets.engine.spreadsheet_calculator import (  # noqa: F401
+        SpreadsheetCalculator,
+    )
+
+_exports = {
+    "CalculationContext": "python_spreadsheets.engine.calculation_context",
+    "FormulaCalculator": "python_spreadsheets.engine.formula_calculator",
+    "SpreadsheetCalculator": "python_spreadsheets.engine.spreadsheet_calculator",
+    "load_from_tsv": "python_spreadsheets.engine.loaders",
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _exports.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(module_name), name)
+    globals()[name] = value
+    return value
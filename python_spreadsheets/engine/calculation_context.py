@@ -1,9 +1,39 @@
 """Объекты для использования в коде формул."""
 
-from typing import AbstractSet, Any, Dict, List, SupportsFloat
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import ChainMap
+from itertools import islice
+from operator import itemgetter
+from typing import (
+    AbstractSet,
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    SupportsFloat,
+    Tuple,
+    Union,
+)
 
-from python_spreadsheets.engine.spreadsheet_helpers import ColumnHelper
-from python_spreadsheets.engine.types import CellIndex
+from python_spreadsheets.engine.functions import (
+    Boolean,
+    Value,
+    ValueSource,
+    avg,
+    count,
+    maximum,
+    minimum,
+    sumif,
+    sumproduct,
+    total,
+)
+from python_spreadsheets.engine.spreadsheet_helpers import CellHelper, ColumnHelper
+from python_spreadsheets.engine.types import CellIndex, CellRectangle, CellValue
 
 
 class CellVariable(float):
@@ -16,46 +46,563 @@ class CellVariable(float):
         self.index = index
 
 
-class CellSlicer:
-    """Объект, позволяющий извлекать диапазоны ячеек."""
+class TextVariable(str):
+    index: CellIndex  # type: ignore[assignment]  # формулам методы str недоступны
+
+    def __new__(cls, value: str, index: CellIndex) -> "TextVariable":
+        return super().__new__(cls, value)
+
+    def __init__(self, value: str, index: CellIndex):
+        self.index = index
+
+
+class BoolVariable(int):
+    """Логическое значение ячейки.
+
+    ``bool`` не допускает наследования, поэтому переменная - целое число 0 или 1,
+    которое в результате формулы снова становится логическим значением.
+    """
+
+    index: CellIndex
+
+    def __new__(cls, value: bool, index: CellIndex) -> "BoolVariable":
+        return super().__new__(cls, value)
+
+    def __init__(self, value: bool, index: CellIndex):
+        self.index = index
+
+    def __repr__(self) -> str:
+        return "TRUE" if self else "FALSE"
+
+    __str__ = __repr__
+
+
+Boolean.register(BoolVariable)
+
+Variable = Union[CellVariable, TextVariable, BoolVariable]
+
+
+def create_variable(value: CellValue, index: CellIndex) -> Variable:
+    """Переменная формулы для значения ячейки; пустая ячейка равна нулю."""
+    if isinstance(value, bool):
+        return BoolVariable(value, index=index)
+    if isinstance(value, str):
+        return TextVariable(value, index=index)
+    return CellVariable(0.0 if value is None else value, index=index)
 
-    _cells: Dict[CellIndex, CellVariable]
+
+class TextPool:
+    """Пул текстов, хранящий каждую уникальную строку один раз."""
+
+    _ids: Dict[str, int]
+    _texts: List[str]
 
     def __init__(self) -> None:
-        self._cells = {}
+        self._ids = {}
+        self._texts = []
+
+    def add(self, text: str) -> int:
+        text_id = self._ids.get(text)
+        if text_id is None:
+            text_id = len(self._texts)
+            self._ids[text] = text_id
+            self._texts.append(text)
+        return text_id
+
+    def get(self, text_id: int) -> str:
+        return self._texts[text_id]
+
+
+class TypedColumn:
+    """Значения ячеек одного столбца в упакованных массивах.
+
+    Номера занятых строк хранятся по возрастанию, для каждой строки - тип
+    значения и число: само значение для числовых ячеек, 0 или 1 для логических
+    или номер строки в пуле текстов для текстовых. Объекты значений создаются только при
+    обращении к ячейке.
+    """
+
+    NUMBER = 0
+    TEXT = 1
+    EMPTY = 2
+    BOOL = 3
+
+    _rows: "array[int]"
+    _kinds: bytearray
+    _numbers: "array[float]"
+    _text_pool: TextPool
+
+    def __init__(self, text_pool: TextPool) -> None:
+        self._rows = array("l")
+        self._kinds = bytearray()
+        self._numbers = array("d")
+        self._text_pool = text_pool
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _find(self, row: int) -> Optional[int]:
+        position = bisect_left(self._rows, row)
+        if position < len(self._rows) and self._rows[position] == row:
+            return position
+        return None
+
+    def has_row(self, row: int) -> bool:
+        return self._find(row) is not None
+
+    def set(self, row: int, value: CellValue) -> None:
+        if value is None:
+            kind, number = self.EMPTY, 0.0
+        elif isinstance(value, str):
+            kind, number = self.TEXT, float(self._text_pool.add(value))
+        elif isinstance(value, bool):
+            kind, number = self.BOOL, float(value)
+        else:
+            kind, number = self.NUMBER, float(value)
+
+        position = bisect_left(self._rows, row)
+        if position < len(self._rows) and self._rows[position] == row:
+            self._kinds[position] = kind
+            self._numbers[position] = number
+        else:
+            self._rows.insert(position, row)
+            self._kinds.insert(position, kind)
+            self._numbers.insert(position, number)
+
+    def _value_at(self, position: int) -> Union[float, str]:
+        kind = self._kinds[position]
+        if kind == self.TEXT:
+            return self._text_pool.get(int(self._numbers[position]))
+        if kind == self.BOOL:
+            return bool(self._numbers[position])
+        return self._numbers[position]
+
+    def get(self, row: int) -> CellValue:
+        """Значение ячейки строки; None для пустой ячейки.
+
+        Raises:
+            KeyError: если строка не занята
+        """
+        position = self._find(row)
+        if position is None:
+            raise KeyError(row)
+        if self._kinds[position] == self.EMPTY:
+            return None
+        return self._value_at(position)
+
+    def rows(self) -> Iterator[int]:
+        return iter(self._rows)
+
+    def _positions(self, start_row: int, stop_row: Optional[int]) -> range:
+        return range(
+            bisect_left(self._rows, start_row),
+            len(self._rows) if stop_row is None else bisect_right(self._rows, stop_row),
+        )
+
+    def count(self, start_row: int, stop_row: int) -> int:
+        """Количество непустых ячеек в диапазоне строк."""
+        positions = self._positions(start_row, stop_row)
+        return len(positions) - self._kinds.count(
+            self.EMPTY, positions.start, positions.stop
+        )
+
+    def items(
+        self, start_row: int = 1, stop_row: Optional[int] = None
+    ) -> Iterator[Tuple[int, Union[float, str]]]:
+        """Пары (строка, значение) непустых ячеек диапазона по возрастанию строк."""
+        for position in self._positions(start_row, stop_row):
+            if self._kinds[position] != self.EMPTY:
+                yield self._rows[position], self._value_at(position)
+
+    def get_item(
+        self, start_row: int, stop_row: int, index: int
+    ) -> Tuple[int, Union[float, str]]:
+        """Пара (строка, значение) непустой ячейки диапазона строк по ее номеру.
+
+        Raises:
+            IndexError: если в диапазоне меньше непустых ячеек
+        """
+        positions = self._positions(start_row, stop_row)
+        if self._kinds.find(self.EMPTY, positions.start, positions.stop) == -1:
+            if not 0 <= index < len(positions):
+                raise IndexError(index)
+            position = positions.start + index
+            return self._rows[position], self._value_at(position)
+
+        for item in islice(self.items(start_row, stop_row), index, None):
+            return item
+        raise IndexError(index)
+
+
+class CellRange(ValueSource):
+    """Прямоугольный диапазон ячеек.
+
+    Диапазон хранит только угловые ячейки, а значения читаются из слайсера при
+    переборе, поэтому создание диапазона не зависит от его размера. Пустые
+    ячейки в диапазон не входят.
+    """
+
+    start: CellIndex
+    stop: CellIndex
+    _slicer: "CellSlicer"
+
+    def __init__(self, start: CellIndex, stop: CellIndex, slicer: "CellSlicer"):
+        self.start = start
+        self.stop = stop
+        self._slicer = slicer
+
+    def __iter__(self) -> Iterator[Variable]:
+        for column, row, value in self._slicer.iter_range(self.start, self.stop):
+            yield create_variable(value, index=CellIndex(column=column, row=row))
+
+    def __len__(self) -> int:
+        return self._slicer.count_range(self.start, self.stop)
+
+    def __contains__(self, value: object) -> bool:
+        if not isinstance(value, (int, float, str)):
+            return False
+        return any(
+            self._slicer.find_row(column, value, self.start.row, self.stop.row)
+            is not None
+            for column in self._slicer.get_range_columns(self.start, self.stop)
+        )
+
+    def __getitem__(self, item: Union[int, slice]) -> Any:
+        if isinstance(item, slice):
+            return list(self)[item]
+
+        index = item + len(self) if item < 0 else item
+        if index < 0:
+            raise IndexError("CellRange index out of range")
+        column, row, value = self._slicer.get_range_item(self.start, self.stop, index)
+        return create_variable(value, index=CellIndex(column=column, row=row))
+
+    def __repr__(self) -> str:
+        return f"CellRange({self.start}:{self.stop})"
+
+    @property
+    def area(self) -> int:
+        columns = ColumnHelper.column_to_number(
+            self.stop.column
+        ) - ColumnHelper.column_to_number(self.start.column)
+        return (columns + 1) * (self.stop.row - self.start.row + 1)
+
+    def values(self) -> Iterator[Value]:
+        for _, _, value in self._slicer.iter_range(self.start, self.stop):
+            yield value
+
+    def offsets(self) -> Iterator[Tuple[int, Value]]:
+        start_column_number = ColumnHelper.column_to_number(self.start.column)
+        rows_number = self.stop.row - self.start.row + 1
+        for column, row, value in self._slicer.iter_range(self.start, self.stop):
+            column_offset = ColumnHelper.column_to_number(column) - start_column_number
+            yield column_offset * rows_number + row - self.start.row, value
+
+
+Cells = Union[Sequence[Variable], CellRange]
+
+
+def get_range_bounds(cells: Cells) -> Tuple[CellIndex, CellIndex]:
+    if isinstance(cells, CellRange):
+        return cells.start, cells.stop
+    return cells[0].index, cells[-1].index
+
+
+class CellSlicer:
+    """Объект, позволяющий извлекать диапазоны ячеек.
+
+    Слайсер слоя видит собственные ячейки поверх ячеек родительского слайсера.
 
-    def add_cell(self, cell: CellVariable) -> None:
-        self._cells[cell.index] = cell
+    Значения хранятся по столбцам в ``TypedColumn``, тексты - в общем для всех
+    слоев пуле строк.
+
+    Для поиска значений в столбце строится хэш-индекс "значение - строки",
+    который сбрасывается при изменении любой ячейки столбца.
+    """
+
+    _columns: Dict[str, TypedColumn]
+    _column_indexes: Dict[str, Dict[Any, List[int]]]
+    _text_pool: TextPool
+    _parent: Optional["CellSlicer"]
+
+    def __init__(self, parent: Optional["CellSlicer"] = None) -> None:
+        self._columns = {}
+        self._column_indexes = {}
+        self._text_pool = TextPool() if parent is None else parent._text_pool
+        self._parent = parent
+
+    def add_value(self, cell_index: CellIndex, value: CellValue) -> None:
+        column = self._columns.get(cell_index.column)
+        if column is None:
+            column = self._columns[cell_index.column] = TypedColumn(self._text_pool)
+        column.set(cell_index.row, value)
+        self._column_indexes.pop(cell_index.column, None)
+
+    def add_cell(self, cell: Variable) -> None:
+        self.add_value(cell.index, str(cell) if isinstance(cell, str) else cell)
+
+    @staticmethod
+    def _get_index_key(value: Union[float, str]) -> Any:
+        """Ключ индекса значений; логические значения не совпадают с 0 и 1."""
+        if isinstance(value, Boolean):
+            return bool(value), Boolean
+        return value
+
+    def _get_column_index(self, column: str) -> Dict[Any, List[int]]:
+        column_index = self._column_indexes.get(column)
+        if column_index is None:
+            column_index = {}
+            if column in self._columns:
+                for row, value in self._columns[column].items():
+                    column_index.setdefault(self._get_index_key(value), []).append(row)
+            self._column_indexes[column] = column_index
+        return column_index
+
+    def _find_rows(self, column: str, value: Union[float, str]) -> List[int]:
+        rows = self._get_column_index(column).get(self._get_index_key(value), [])
+        if self._parent is None:
+            return rows
+
+        own_column = self._columns.get(column)
+        parent_rows = self._parent._find_rows(column, value)
+        if own_column is None:
+            return parent_rows
+
+        parent_rows = [row for row in parent_rows if not own_column.has_row(row)]
+        return sorted(parent_rows + rows) if rows else parent_rows
+
+    def find_row(
+        self, column: str, value: Union[float, str], start_row: int, stop_row: int
+    ) -> Optional[int]:
+        """Поиск первой строки диапазона столбца с заданным значением.
+
+        Args:
+            column: столбец поиска
+            value: искомое значение
+            start_row: первая строка диапазона
+            stop_row: последняя строка диапазона
+
+        Returns: Номер найденной строки или None
+        """
+        rows = self._find_rows(column, value)
+        position = bisect_left(rows, start_row)
+        if position < len(rows) and rows[position] <= stop_row:
+            return rows[position]
+        return None
+
+    def match(self, value: Union[float, str], cells: Cells) -> int:
+        """Позиция первой ячейки диапазона с заданным значением (с единицы)."""
+        if not cells:
+            raise LookupError(f"Value {value} not found")
+
+        start, stop = get_range_bounds(cells)
+        if start.column == stop.column:
+            row = self.find_row(start.column, value, start.row, stop.row)
+            if row is not None:
+                return row - start.row + 1
+        else:
+            start_column_number = ColumnHelper.column_to_number(start.column)
+            height = stop.row - start.row + 1
+            for cell in cells:
+                if cell == value:
+                    column_offset = (
+                        ColumnHelper.column_to_number(cell.index.column)
+                        - start_column_number
+                    )
+                    return column_offset * height + cell.index.row - start.row + 1
+
+        raise LookupError(f"Value {value} not found")
+
+    def vlookup(
+        self, value: Union[float, str], cells: Cells, column_number: int
+    ) -> Variable:
+        """Поиск значения в первом столбце диапазона.
+
+        Args:
+            value: искомое значение
+            cells: диапазон таблицы
+            column_number: номер столбца диапазона (с единицы), из которого
+                           берется результат
+
+        Returns: Ячейка столбца ``column_number`` из найденной строки
+        """
+        if not cells:
+            raise LookupError(f"Value {value} not found")
+
+        start, stop = get_range_bounds(cells)
+        start_column_number = ColumnHelper.column_to_number(start.column)
+        width = ColumnHelper.column_to_number(stop.column) - start_column_number + 1
+        if not (1 <= column_number <= width):
+            raise LookupError(f"Column number out of range (1-{width})")
+
+        row = self.find_row(start.column, value, start.row, stop.row)
+        if row is None:
+            raise LookupError(f"Value {value} not found")
+
+        column = ColumnHelper.number_to_column(start_column_number + column_number - 1)
+        return self.get_cell(CellIndex(column=column, row=row))
+
+    def get_value(self, cell_index: CellIndex) -> CellValue:
+        """Значение ячейки; None для пустой ячейки.
+
+        Raises:
+            KeyError: если ячейки нет в таблице
+        """
+        column = self._columns.get(cell_index.column)
+        if column is not None and column.has_row(cell_index.row):
+            return column.get(cell_index.row)
+        if self._parent is not None:
+            return self._parent.get_value(cell_index)
+        raise KeyError(cell_index)
+
+    def get_cell(self, cell_index: CellIndex) -> Variable:
+        return create_variable(self.get_value(cell_index), index=cell_index)
+
+    def has_cell(self, cell_index: CellIndex) -> bool:
+        column = self._columns.get(cell_index.column)
+        if column is not None and column.has_row(cell_index.row):
+            return True
+        return self._parent is not None and self._parent.has_cell(cell_index)
+
+    def get_indexes(self) -> Iterator[CellIndex]:
+        """Индексы всех ячеек слоя и родительских слоев, включая пустые."""
+        for column_name, column in self._columns.items():
+            for row in column.rows():
+                yield CellIndex(column=column_name, row=row)
+
+        if self._parent is not None:
+            for cell_index in self._parent.get_indexes():
+                if cell_index.column not in self._columns or not self._columns[
+                    cell_index.column
+                ].has_row(cell_index.row):
+                    yield cell_index
 
     @staticmethod
     def _check_slice_types(value: slice) -> None:
-        if not isinstance(value.start, CellVariable):
+        if not isinstance(value.start, (CellVariable, TextVariable, BoolVariable)):
             raise ValueError(f"Start in {value} must be a CellVariable")
-        if not isinstance(value.stop, CellVariable):
+        if not isinstance(value.stop, (CellVariable, TextVariable, BoolVariable)):
             raise ValueError(f"Stop in {value} must be CellVariable")
         if value.step:
             raise ValueError("Step is not supported")
 
-    def get_cells(self, cell_slice: slice) -> List[CellVariable]:
-        start_column_number = ColumnHelper.column_to_number(
-            cell_slice.start.index.column
+    def _get_columns(self) -> AbstractSet[str]:
+        if self._parent is None:
+            return self._columns.keys()
+        return self._columns.keys() | self._parent._get_columns()
+
+    def _iter_column(
+        self, column: str, start_row: int, stop_row: int
+    ) -> Iterator[Tuple[int, Union[float, str]]]:
+        """Пары (строка, значение) непустых ячеек столбца по возрастанию строк.
+
+        Границы диапазона находятся бинарным поиском по номерам строк столбца,
+        собственные ячейки слоя перекрывают ячейки родительского слайсера.
+        """
+        own_column = self._columns.get(column)
+        own_items = own_column.items(start_row, stop_row) if own_column else iter(())
+
+        if self._parent is None:
+            return own_items
+
+        parent_items = self._parent._iter_column(column, start_row, stop_row)
+        if own_column is None:
+            return parent_items
+
+        return heapq.merge(
+            own_items,
+            (
+                (row, value)
+                for row, value in parent_items
+                if not own_column.has_row(row)
+            ),
+            key=itemgetter(0),
         )
-        start_row = cell_slice.start.index.row
 
-        stop_column_number = ColumnHelper.column_to_number(cell_slice.stop.index.column)
-        stop_row = cell_slice.stop.index.row
+    def get_range_columns(self, start: CellIndex, stop: CellIndex) -> Iterator[str]:
+        """Занятые столбцы диапазона по возрастанию.
 
-        result = []
-        for column_number in range(start_column_number, stop_column_number + 1):
-            for row in range(start_row, stop_row + 1):
-                cell_index = CellIndex(
-                    column=ColumnHelper.number_to_column(column_number), row=row,
+        Перебирается меньшее из столбцов диапазона и занятых столбцов.
+        """
+        start_column_number = ColumnHelper.column_to_number(start.column)
+        stop_column_number = ColumnHelper.column_to_number(stop.column)
+
+        columns = self._get_columns()
+        if stop_column_number - start_column_number < len(columns):
+            return (
+                column
+                for column in (
+                    ColumnHelper.number_to_column(column_number)
+                    for column_number in range(
+                        start_column_number, stop_column_number + 1
+                    )
                 )
-                result.append(self._cells[cell_index])
+                if column in columns
+            )
 
-        return result
+        return (
+            column
+            for column_number, column in sorted(
+                (ColumnHelper.column_to_number(column), column) for column in columns
+            )
+            if start_column_number <= column_number <= stop_column_number
+        )
 
-    def __getitem__(self, item: slice) -> List[CellVariable]:
+    def iter_range(
+        self, start: CellIndex, stop: CellIndex
+    ) -> Iterator[Tuple[str, int, Union[float, str]]]:
+        """Тройки (столбец, строка, значение) непустых ячеек диапазона по столбцам.
+
+        Перебор идет только по занятым столбцам и строкам, поэтому стоимость
+        не зависит от площади диапазона.
+        """
+        for column in self.get_range_columns(start, stop):
+            for row, value in self._iter_column(column, start.row, stop.row):
+                yield column, row, value
+
+    def get_range_item(
+        self, start: CellIndex, stop: CellIndex, index: int
+    ) -> Tuple[str, int, Union[float, str]]:
+        """Тройка (столбец, строка, значение) непустой ячейки диапазона по номеру.
+
+        В корневом слайсере столбцы пропускаются по количеству их непустых
+        ячеек, без перебора значений.
+
+        Raises:
+            IndexError: если в диапазоне меньше непустых ячеек
+        """
+        if self._parent is not None:
+            for item in islice(self.iter_range(start, stop), index, None):
+                return item
+            raise IndexError("CellRange index out of range")
+
+        for column in self.get_range_columns(start, stop):
+            typed_column = self._columns[column]
+            count = typed_column.count(start.row, stop.row)
+            if index < count:
+                row, value = typed_column.get_item(start.row, stop.row, index)
+                return column, row, value
+            index -= count
+
+        raise IndexError("CellRange index out of range")
+
+    def count_range(self, start: CellIndex, stop: CellIndex) -> int:
+        """Количество непустых ячеек диапазона."""
+        if self._parent is not None:
+            return sum(1 for _ in self.iter_range(start, stop))
+
+        return sum(
+            self._columns[column].count(start.row, stop.row)
+            for column in self.get_range_columns(start, stop)
+        )
+
+    def get_cells(self, cell_slice: slice) -> CellRange:
+        """Диапазон ячеек между угловыми ячейками среза."""
+        return CellRange(
+            start=cell_slice.start.index, stop=cell_slice.stop.index, slicer=self
+        )
+
+    def __getitem__(self, item: slice) -> CellRange:
         if isinstance(item, slice):
             self._check_slice_types(item)
             return self.get_cells(cell_slice=item)
@@ -63,24 +610,114 @@ class CellSlicer:
             raise ValueError(f"CellSlicer indices must be slice, not {type(item)}")
 
 
+class CellNamespace(dict):
+    """Пространство имен формул, в котором имена ячеек берутся из слайсера.
+
+    Значения ячеек не хранятся в словаре: переменная ячейки создается при
+    обращении к ее имени. Остальные недостающие имена берутся из родительского
+    пространства имен.
+    """
+
+    _slicer: CellSlicer
+    _parent: Optional[Mapping[str, Any]]
+
+    def __init__(
+        self, slicer: CellSlicer, parent: Optional[Mapping[str, Any]] = None
+    ) -> None:
+        super().__init__()
+        self._slicer = slicer
+        self._parent = parent
+
+    def __missing__(self, key: str) -> Any:
+        cell_index = CellHelper.parse_cell_index(key)
+        if cell_index is not None and self._slicer.has_cell(cell_index):
+            return self._slicer.get_cell(cell_index)
+        if self._parent is not None:
+            return self._parent[key]
+        raise KeyError(key)
+
+
+class ContextNames(AbstractSet[str]):
+    """Имена, доступные формулам контекста, включая имена всех ячеек."""
+
+    _namespaces: Sequence[Mapping[str, Any]]
+    _slicer: CellSlicer
+
+    def __init__(
+        self, namespaces: Sequence[Mapping[str, Any]], slicer: CellSlicer
+    ) -> None:
+        self._namespaces = namespaces
+        self._slicer = slicer
+
+    def __contains__(self, name: object) -> bool:
+        if not isinstance(name, str):
+            return False
+        if any(name in namespace for namespace in self._namespaces):
+            return True
+        cell_index = CellHelper.parse_cell_index(name)
+        return cell_index is not None and self._slicer.has_cell(cell_index)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from ChainMap(*self._namespaces)  # type: ignore
+        for cell_index in self._slicer.get_indexes():
+            yield cell_index.as_string()
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
 class CalculationContext:
-    _context: Dict[str, Any]
+    """Пространство имен для вычисления формул.
+
+    Контекст может быть слоем поверх родительского контекста (см. ``overlay``):
+    слой хранит только переопределенные ячейки, остальные значения читаются из
+    родителя без копирования.
+
+    Значения ячеек хранятся только в слайсере, имена ячеек разрешаются
+    пространством имен при вычислении формулы.
+    """
+
+    _context: CellNamespace
 
     _slicer: CellSlicer
 
-    _builtin_functions = {"sum": sum, "min": min, "max": max}
+    _parent: Optional["CalculationContext"]
 
-    def __init__(self) -> None:
-        self._context = {}
+    _builtin_functions = {
+        "sum": total,
+        "min": minimum,
+        "max": maximum,
+        "avg": avg,
+        "count": count,
+        "sumif": sumif,
+        "sumproduct": sumproduct,
+    }
+
+    def __init__(self, parent: Optional["CalculationContext"] = None) -> None:
+        self._parent = parent
+
+        if parent is None:
+            self._slicer = CellSlicer()
+            self._context = CellNamespace(self._slicer)
+            self._context.update(self._builtin_functions)
+        else:
+            self._slicer = CellSlicer(parent=parent._slicer)
+            self._context = CellNamespace(self._slicer, parent=parent.context)
 
-        self._slicer = CellSlicer()
         self._context["s"] = self._slicer
-        self._context.update(self._builtin_functions)
+        self._context["match"] = self._slicer.match
+        self._context["vlookup"] = self._slicer.vlookup
+
+    def overlay(self) -> "CalculationContext":
+        """Создание слоя для переопределения ячеек без изменения этого контекста."""
+        return CalculationContext(parent=self)
+
+    def add_cell(self, value: CellValue, cell_index: CellIndex) -> None:
+        self._slicer.add_value(cell_index, value)
 
-    def add_cell(self, value: float, cell_index: CellIndex) -> None:
-        cell = CellVariable(value, index=cell_index)
-        self._slicer.add_cell(cell)
-        self._context[cell_index.as_string()] = cell
+    def count_cells(self, rectangle: CellRectangle) -> int:
+        """Количество непустых ячеек прямоугольного диапазона."""
+        return self._slicer.count_range(rectangle.start, rectangle.stop)
 
     @property
     def context(self) -> Dict[str, Any]:
@@ -88,4 +725,9 @@ class CalculationContext:
 
     @property
     def names(self) -> AbstractSet[str]:
-        return self._context.keys()
+        layers = []
+        context: Optional[CalculationContext] = self
+        while context is not None:
+            layers.append(context._context)
+            context = context._parent
+        return ContextNames(layers, slicer=self._slicer)
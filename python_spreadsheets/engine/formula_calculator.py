@@ -1,7 +1,19 @@
 import ast
-from typing import AbstractSet
+from functools import lru_cache
+from types import CodeType
+from typing import AbstractSet, FrozenSet, List, NamedTuple, Optional, Set, Tuple, Union
 
 from python_spreadsheets.engine.calculation_context import CalculationContext
+from python_spreadsheets.engine.functions import Boolean
+from python_spreadsheets.engine.spreadsheet_helpers import CellHelper
+from python_spreadsheets.engine.types import (
+    CellIndex,
+    CellRectangle,
+    ErrorKind,
+    ErrorValue,
+)
+
+FORMULA_CACHE_SIZE = 4096
 
 
 class FormulaError(Exception):
@@ -12,8 +24,20 @@ class FormulaRuntimeError(FormulaError):
     pass
 
 
+class FormulaValidationError(FormulaError, ValueError):
+    pass
+
+
+class CompiledFormula(NamedTuple):
+    """Провалидированный и скомпилированный код формулы."""
+
+    code: CodeType
+    names: FrozenSet[str]
+    ranges: FrozenSet[Tuple[str, str]]
+
+
 class FormulaCalculator:
-    _allowed_literals = {ast.Num, ast.NameConstant}
+    _allowed_literals = {ast.Num, ast.Str, ast.NameConstant}
 
     _allowed_expressions = {
         ast.BinOp,
@@ -78,56 +102,218 @@ class FormulaCalculator:
     _allowed_context_nodes = {ast.Load}
 
     @classmethod
-    def calculate(cls, source: str, calculation_context: CalculationContext) -> float:
-
-        cls.validate(source=source, allowed_names=calculation_context.names)
+    def evaluate(
+        cls, source: str, calculation_context: CalculationContext
+    ) -> Union[float, str, ErrorValue]:
+        """Вычисление формулы без выбрасывания исключений.
+
+        Args:
+            source: исходный код формулы
+            calculation_context: контекст вычисления
+
+        Returns: Значение формулы или описание ошибки
+        """
+        compiled_formula = cls._compile_or_error(source)
+        if isinstance(compiled_formula, ErrorValue):
+            return compiled_formula
+
+        forbidden_name = cls._find_forbidden_name(
+            names=compiled_formula.names, allowed_names=calculation_context.names
+        )
+        if forbidden_name is not None:
+            return ErrorValue(
+                kind=ErrorKind.UNKNOWN_NAME,
+                message=f"Found forbidden name in lambda body: {forbidden_name}",
+            )
 
         global_variables = calculation_context.context
 
-        function = eval(source, global_variables, {})
+        function = eval(compiled_formula.code, global_variables, {})
         try:
             result = function()
-        except TypeError as e:
-            raise FormulaRuntimeError(f"Runtime error: {e}")
+        except (TypeError, ValueError, LookupError, ArithmeticError) as e:
+            return ErrorValue(kind=ErrorKind.RUNTIME, message=f"Runtime error: {e}")
 
-        try:
-            return float(result)
-        except TypeError:
-            raise FormulaRuntimeError(
-                f"Formula result must be a number, not {type(result)}"
+        if isinstance(result, str):
+            return str(result)
+
+        if isinstance(result, Boolean):
+            return bool(result)
+
+        if not isinstance(result, (int, float)):
+            return ErrorValue(
+                kind=ErrorKind.RUNTIME,
+                message=f"Formula result must be a number or text, not {type(result)}",
             )
 
+        return float(result)
+
+    @classmethod
+    def calculate(
+        cls, source: str, calculation_context: CalculationContext
+    ) -> Union[float, str]:
+        value = cls.evaluate(source=source, calculation_context=calculation_context)
+
+        if isinstance(value, ErrorValue):
+            if value.kind == ErrorKind.RUNTIME:
+                raise FormulaRuntimeError(value.message)
+            raise FormulaValidationError(value.message)
+
+        return value
+
     @classmethod
     def validate(cls, source: str, allowed_names: AbstractSet[str]) -> None:
-        module = ast.parse(source)
+        compiled_formula = cls.compile(source=source)
+        cls.validate_names(names=compiled_formula.names, allowed_names=allowed_names)
+
+    @staticmethod
+    def _find_forbidden_name(
+        names: AbstractSet[str], allowed_names: AbstractSet[str]
+    ) -> Optional[str]:
+        forbidden_names = [name for name in names if name not in allowed_names]
+        return min(forbidden_names) if forbidden_names else None
+
+    @classmethod
+    def validate_names(
+        cls, names: AbstractSet[str], allowed_names: AbstractSet[str]
+    ) -> None:
+        forbidden_name = cls._find_forbidden_name(
+            names=names, allowed_names=allowed_names
+        )
+        if forbidden_name is not None:
+            raise FormulaValidationError(
+                f"Found forbidden name in lambda body: {forbidden_name}"
+            )
+
+    @classmethod
+    @lru_cache(maxsize=FORMULA_CACHE_SIZE)
+    def _compile_or_error(cls, source: str) -> Union[CompiledFormula, ErrorValue]:
+        # Ошибки кэшируются наравне с результатами, чтобы некорректные формулы
+        # не разбирались заново при каждом пересчете.
+        try:
+            return cls._compile_source(source)
+        except FormulaValidationError as e:
+            return ErrorValue(kind=ErrorKind.INVALID_FORMULA, message=str(e))
+
+    @classmethod
+    def compile(cls, source: str) -> CompiledFormula:
+        """Разбор, проверка структуры и компиляция исходного кода формулы.
+
+        Результат кэшируется по исходному коду и переиспользуется всеми таблицами
+        процесса, поэтому одинаковые формулы разбираются только один раз.
+
+        Args:
+            source: исходный код формулы
+
+        Returns: Скомпилированный код и имена, используемые в теле формулы
+        Raises:
+            FormulaValidationError: если формула содержит недопустимые конструкции
+        """
+        compiled_formula = cls._compile_or_error(source)
+        if isinstance(compiled_formula, ErrorValue):
+            raise FormulaValidationError(compiled_formula.message)
+        return compiled_formula
+
+    @classmethod
+    def _compile_source(cls, source: str) -> CompiledFormula:
+        try:
+            module = ast.parse(source)
+        except SyntaxError as e:
+            raise FormulaValidationError(f"Syntax error: {e.msg}")
+
         body = module.body
 
         if len(body) != 1:
-            raise ValueError("Source must contain only 1 expression")
+            raise FormulaValidationError("Source must contain only 1 expression")
 
         expression = body[0]
 
         if not isinstance(expression, ast.Expr):
-            raise ValueError(f"Source must contain expression but found {expression}")
+            raise FormulaValidationError(
+                f"Source must contain expression but found {expression}"
+            )
 
         lambda_ = expression.value
 
         if not isinstance(lambda_, ast.Lambda):
-            raise ValueError(f"Source must contain lambda but found {lambda_}")
+            raise FormulaValidationError(
+                f"Source must contain lambda but found {lambda_}"
+            )
 
         if lambda_.args.args:
-            raise ValueError("Lambda must not contain arguments")
+            raise FormulaValidationError("Lambda must not contain arguments")
 
         lambda_body = lambda_.body
 
         if type(lambda_body) not in cls._allowed_body_roots:
-            raise ValueError(
+            raise FormulaValidationError(
                 f"Lambda body must be one of {cls._allowed_body_roots}, "
                 f"but found {lambda_body}"
             )
 
+        names: Set[str] = set()
+        ranges: Set[Tuple[str, str]] = set()
         for node in ast.walk(lambda_body):
             if type(node) not in cls._allowed_body_nodes:
-                raise ValueError(f"Found forbidden node in lambda body: {node}")
-            if isinstance(node, ast.Name) and node.id not in allowed_names:
-                raise ValueError(f"Found forbidden name in lambda body: {node.id}")
+                raise FormulaValidationError(
+                    f"Found forbidden node in lambda body: {node}"
+                )
+            if isinstance(node, ast.Name):
+                names.add(node.id)
+            if (
+                isinstance(node, ast.Slice)
+                and isinstance(node.lower, ast.Name)
+                and isinstance(node.upper, ast.Name)
+            ):
+                ranges.add((node.lower.id, node.upper.id))
+
+        code = compile(ast.Expression(body=lambda_), "<formula>", "eval")
+
+        return CompiledFormula(
+            code=code, names=frozenset(names), ranges=frozenset(ranges)
+        )
+
+    @classmethod
+    def dependencies(cls, source: str) -> List[CellIndex]:
+        """Индексы ячеек, на которые формула ссылается по имени.
+
+        Ячейки диапазонов не перечисляются, см. ``ranges``.
+
+        Args:
+            source: исходный код формулы
+
+        Returns: Индексы ячеек, упомянутых по имени
+        Raises:
+            FormulaValidationError: если формула содержит недопустимые конструкции
+        """
+        compiled_formula = cls.compile(source=source)
+
+        dependencies = []
+        for name in sorted(compiled_formula.names):
+            cell_index = CellHelper.parse_cell_index(name)
+            if cell_index is not None:
+                dependencies.append(cell_index)
+
+        return dependencies
+
+    @classmethod
+    def ranges(cls, source: str) -> List[CellRectangle]:
+        """Прямоугольные диапазоны ячеек, на которые ссылается формула.
+
+        Args:
+            source: исходный код формулы
+
+        Returns: Диапазоны, заданные угловыми ячейками
+        Raises:
+            FormulaValidationError: если формула содержит недопустимые конструкции
+        """
+        compiled_formula = cls.compile(source=source)
+
+        ranges = []
+        for start_name, stop_name in sorted(compiled_formula.ranges):
+            start = CellHelper.parse_cell_index(start_name)
+            stop = CellHelper.parse_cell_index(stop_name)
+            if start is not None and stop is not None:
+                ranges.append(CellRectangle(start=start, stop=stop))
+
+        return ranges
@@ -0,0 +1,148 @@
+"""Встроенные функции для использования в коде формул.
+
+Как и в электронных таблицах, текстовые и логические ячейки диапазонов
+не участвуют в подсчетах и суммах.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+Value = Union[float, str]
+
+
+class Boolean(ABC):
+    """Логические значения: ``bool`` и переменные логических ячеек."""
+
+
+Boolean.register(bool)
+
+
+class ValueSource(ABC):
+    """Диапазон, значения ячеек которого можно получить без создания переменных."""
+
+    @property
+    @abstractmethod
+    def area(self) -> int:
+        """Количество ячеек диапазона, включая пустые."""
+
+    @abstractmethod
+    def values(self) -> Iterator[Value]:
+        pass
+
+    @abstractmethod
+    def offsets(self) -> Iterator[Tuple[int, Value]]:
+        """Пары (смещение, значение) непустых ячеек.
+
+        Смещение - номер ячейки в диапазоне при переборе по столбцам,
+        с учетом пустых ячеек.
+        """
+
+    def numbers(self) -> Iterator[float]:
+        return (value for value in self.values() if not isinstance(value, (str, bool)))
+
+
+def range_numbers(cells: Iterable[Any]) -> Iterable[Any]:
+    """Числа диапазона без создания переменных; другие значения - как есть."""
+    if isinstance(cells, ValueSource):
+        return cells.numbers()
+    return cells
+
+
+def numbers(cells: Iterable[Value]) -> Iterator[float]:
+    if isinstance(cells, ValueSource):
+        return cells.numbers()
+    return (cell for cell in cells if not isinstance(cell, (str, Boolean)))
+
+
+def _get_cell_map(cells: Iterable[Value]) -> Tuple[int, Dict[int, Value]]:
+    """Размер диапазона и значения его непустых ячеек по смещениям."""
+    if isinstance(cells, ValueSource):
+        return cells.area, dict(cells.offsets())
+    values = list(cells)
+    return len(values), dict(enumerate(values))
+
+
+def total(cells: Iterable[Any], start: Any = 0) -> Any:
+    """Встроенная ``sum``, суммирующая только числовые ячейки диапазонов."""
+    return sum(range_numbers(cells), start)
+
+
+def minimum(*args: Any, **kwargs: Any) -> Any:
+    """Встроенная ``min`` по числовым ячейкам диапазонов."""
+    if len(args) == 1:
+        args = (range_numbers(args[0]),)
+    return min(*args, **kwargs)
+
+
+def maximum(*args: Any, **kwargs: Any) -> Any:
+    """Встроенная ``max`` по числовым ячейкам диапазонов."""
+    if len(args) == 1:
+        args = (range_numbers(args[0]),)
+    return max(*args, **kwargs)
+
+
+def avg(cells: Iterable[Value]) -> float:
+    values = list(numbers(cells))
+    return sum(values) / len(values)
+
+
+def count(cells: Iterable[Value]) -> int:
+    return sum(1 for _ in numbers(cells))
+
+
+def sumif(
+    cells: Iterable[Value],
+    criterion: Value,
+    sum_cells: Optional[Iterable[Value]] = None,
+) -> float:
+    """Сумма ячеек, значения которых равны критерию.
+
+    Args:
+        cells: проверяемые ячейки
+        criterion: значение, с которым сравниваются ячейки
+        sum_cells: суммируемые ячейки, по умолчанию проверяемые
+
+    Returns: Сумма ячеек, соответствующих критерию
+    """
+    if sum_cells is None:
+        return sum(numbers(cell for cell in cells if cell == criterion))
+
+    area, values = _get_cell_map(cells)
+    sum_area, sum_values = _get_cell_map(sum_cells)
+    if area != sum_area:
+        raise TypeError("sumif ranges must have the same size")
+
+    return sum(
+        numbers(
+            sum_values[offset]
+            for offset, value in values.items()
+            if value == criterion and offset in sum_values
+        )
+    )
+
+
+def sumproduct(*ranges: Iterable[Value]) -> float:
+    """Сумма произведений соответствующих ячеек диапазонов.
+
+    Ячейки сопоставляются по положению в диапазоне, пустые, текстовые
+    и логические ячейки считаются равными нулю.
+    """
+    cell_maps = [_get_cell_map(cells) for cells in ranges]
+    if not cell_maps or any(area != cell_maps[0][0] for area, _ in cell_maps):
+        raise TypeError("sumproduct ranges must have the same size")
+
+    # ненулевыми могут быть только произведения ячеек, непустых во всех диапазонах
+    _, shortest = min(cell_maps, key=lambda cell_map: len(cell_map[1]))
+
+    result = 0.0
+    for offset in shortest:
+        product = 1.0
+        for _, values in cell_maps:
+            value = values.get(offset)
+            if value is None or isinstance(value, (str, Boolean)):
+                product = 0.0
+                break
+            product *= value
+        result += product
+
+    return result
@@ -1,18 +1,45 @@
 import csv
 from pathlib import Path
-from typing import Iterator, Tuple
+from typing import Iterable, Iterator, Tuple
 
 from python_spreadsheets.engine.spreadsheet_calculator import SpreadsheetCalculator
-from python_spreadsheets.engine.spreadsheet_helpers import ColumnHelper
+from python_spreadsheets.engine.spreadsheet_helpers import (
+    MAX_COLUMNS_NUMBER,
+    MAX_ROWS_NUMBER,
+    ColumnHelper,
+)
 from python_spreadsheets.engine.types import Cell, CellIndex, Deferred
 
 
-def _tsv_to_cells(tsv_path: Path) -> Iterator[Tuple[CellIndex, Cell]]:
-    with open(tsv_path, "r", newline="") as tsv_file:
-        tsv_reader = csv.reader(tsv_file, delimiter="\t")
-        next(tsv_reader)  # skip first row
+class TsvParser:
+    """Разбор таблицы в формате TSV по мере поступления строк.
+
+    Первая строка таблицы (заголовок) и первый столбец (номера строк)
+    пропускаются. Состояние сохраняется между вызовами ``parse``, поэтому
+    строки можно передавать частями, например при потоковой загрузке.
+    """
+
+    _rows_number: int
+
+    def __init__(self) -> None:
+        self._rows_number = 0
+
+    def parse(self, lines: Iterable[str]) -> Iterator[Tuple[CellIndex, Cell]]:
+        """Разбор очередных строк таблицы.
+
+        Args:
+            lines: строки таблицы вместе с символами перевода строки
+
+        Returns: Пары (индекс, ячейка) в порядке следования в таблице
+        """
+        tsv_reader = csv.reader(lines, delimiter="\t")
+
+        for row in tsv_reader:
+            row_index = self._rows_number
+            self._rows_number += 1
+            if row_index == 0:
+                continue  # skip first row
 
-        for row_index, row in enumerate(tsv_reader, start=1):
             for column_index, cell_input in enumerate(
                 row[1:], start=1
             ):  # skip first column
@@ -23,11 +50,16 @@ def _tsv_to_cells(tsv_path: Path) -> Iterator[Tuple[CellIndex, Cell]]:
                 yield (cell_index, cell)
 
 
+def _tsv_to_cells(tsv_path: Path) -> Iterator[Tuple[CellIndex, Cell]]:
+    with open(tsv_path, "r", newline="") as tsv_file:
+        yield from TsvParser().parse(tsv_file)
+
+
 def load_from_tsv(tsv_path: Path) -> SpreadsheetCalculator:
     cells_with_index = _tsv_to_cells(tsv_path)
 
     spreadsheet_calculator = SpreadsheetCalculator(
-        columns_number=1000, rows_number=1000
+        columns_number=MAX_COLUMNS_NUMBER, rows_number=MAX_ROWS_NUMBER
     )
 
     for cell_index, cell in cells_with_index:
@@ -0,0 +1,216 @@
+"""Профилирование расчета формул.
+
+Для каждой формулы и для каждой формы формулы накапливаются время расчета,
+количество расчетов и количество непустых ячеек прочитанных диапазонов.
+Форма формулы - ее исходный код, в котором ссылки на ячейки заменены
+относительными ссылками в стиле R1C1, поэтому формулы, скопированные
+вдоль столбца, имеют одну форму::
+
+    b2: lambda: a2 * 2  ->  lambda: RC[-1] * 2
+    b3: lambda: a3 * 2  ->  lambda: RC[-1] * 2
+"""
+
+import io
+import tokenize
+from typing import Any, Dict, Iterator, List, Tuple
+
+from python_spreadsheets.engine.spreadsheet_helpers import CellHelper, ColumnHelper
+from python_spreadsheets.engine.types import CellIndex
+
+DEFAULT_TOP_SIZE = 20
+
+
+def _format_offset(axis: str, offset: int) -> str:
+    return f"{axis}[{offset}]" if offset else axis
+
+
+def normalize_formula(source: str, cell_index: CellIndex) -> str:
+    """Форма формулы с относительными ссылками на ячейки.
+
+    Args:
+        source: исходный код формулы
+        cell_index: индекс ячейки формулы
+
+    Returns: Исходный код, в котором имена ячеек заменены на ``R[i]C[j]``
+    """
+    lines = source.splitlines(keepends=True)
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line))
+
+    column_number = ColumnHelper.column_to_number(cell_index.column)
+
+    parts = []
+    position = 0
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(source).readline):
+            if token.type != tokenize.NAME:
+                continue
+            reference = CellHelper.parse_cell_index(token.string)
+            if reference is None:
+                continue
+
+            start = offsets[token.start[0] - 1] + token.start[1]
+            parts.append(source[position:start])
+            parts.append(
+                _format_offset("R", reference.row - cell_index.row)
+                + _format_offset(
+                    "C", ColumnHelper.column_to_number(reference.column) - column_number
+                )
+            )
+            position = start + len(token.string)
+    except (tokenize.TokenError, SyntaxError):
+        pass  # некорректная формула остается как есть после разобранной части
+
+    parts.append(source[position:])
+    return "".join(parts).strip()
+
+
+class FormulaStats:
+    """Накопленная статистика расчета формулы или формы."""
+
+    time: float
+    calls: int
+    range_cells: int
+
+    def __init__(self) -> None:
+        self.time = 0.0
+        self.calls = 0
+        self.range_cells = 0
+
+    def add(self, duration: float, range_cells: int) -> None:
+        self.time += duration
+        self.calls += 1
+        self.range_cells += range_cells
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "time": self.time,
+            "calls": self.calls,
+            "range_cells": self.range_cells,
+        }
+
+
+class FormulaProfiler:
+    """Статистика расчета формул по ячейкам и по формам."""
+
+    cells: Dict[CellIndex, FormulaStats]
+    shapes: Dict[str, FormulaStats]
+    _cell_shapes: Dict[CellIndex, str]
+
+    def __init__(self) -> None:
+        self.cells = {}
+        self.shapes = {}
+        self._cell_shapes = {}
+
+    def record(
+        self, cell_index: CellIndex, source: str, duration: float, range_cells: int
+    ) -> None:
+        """Учет одного расчета формулы.
+
+        Args:
+            cell_index: индекс ячейки формулы
+            source: исходный код формулы
+            duration: время расчета в секундах
+            range_cells: количество непустых ячеек в диапазонах формулы
+        """
+        shape = self._cell_shapes.get(cell_index)
+        if shape is None:
+            shape = normalize_formula(source, cell_index)
+            self._cell_shapes[cell_index] = shape
+            self.cells[cell_index] = FormulaStats()
+            self.shapes.setdefault(shape, FormulaStats())
+
+        self.cells[cell_index].add(duration, range_cells)
+        self.shapes[shape].add(duration, range_cells)
+
+    @property
+    def total_time(self) -> float:
+        return sum(stats.time for stats in self.cells.values())
+
+    def top_cells(
+        self, size: int = DEFAULT_TOP_SIZE
+    ) -> List[Tuple[CellIndex, FormulaStats]]:
+        """Ячейки с наибольшим суммарным временем расчета."""
+        return sorted(self.cells.items(), key=lambda item: -item[1].time)[:size]
+
+    def top_shapes(
+        self, size: int = DEFAULT_TOP_SIZE
+    ) -> List[Tuple[str, FormulaStats]]:
+        """Формы с наибольшим суммарным временем расчета."""
+        return sorted(self.shapes.items(), key=lambda item: -item[1].time)[:size]
+
+    def _count_formulas(self) -> Dict[str, int]:
+        formulas: Dict[str, int] = {}
+        for shape in self._cell_shapes.values():
+            formulas[shape] = formulas.get(shape, 0) + 1
+        return formulas
+
+    def report(self, size: int = DEFAULT_TOP_SIZE) -> str:
+        """Текстовый отчет о самых затратных ячейках и формах."""
+        total_time = self.total_time
+        formulas = self._count_formulas()
+
+        def share(stats: FormulaStats) -> float:
+            return stats.time / total_time * 100 if total_time else 0.0
+
+        lines = [
+            f"formulas: {len(self.cells)}, shapes: {len(self.shapes)}, "
+            f"time: {total_time * 1000:.3f} ms",
+            "",
+            f"{'time, ms':>10} {'share':>6} {'calls':>6} {'range cells':>11}  cell",
+        ]
+        for cell_index, stats in self.top_cells(size):
+            lines.append(
+                f"{stats.time * 1000:>10.3f} {share(stats):>5.1f}% {stats.calls:>6} "
+                f"{stats.range_cells:>11}  {cell_index.column}{cell_index.row}: "
+                f"{self._cell_shapes[cell_index]}"
+            )
+
+        lines.extend(
+            [
+                "",
+                f"{'time, ms':>10} {'share':>6} {'calls':>6} {'range cells':>11}  "
+                f"formulas shape",
+            ]
+        )
+        for shape, stats in self.top_shapes(size):
+            lines.append(
+                f"{stats.time * 1000:>10.3f} {share(stats):>5.1f}% {stats.calls:>6} "
+                f"{stats.range_cells:>11}  {formulas[shape]:>8} {shape}"
+            )
+
+        return "\n".join(lines)
+
+    def as_dict(self, size: int = DEFAULT_TOP_SIZE) -> Dict[str, Any]:
+        """Отчет о самых затратных ячейках и формах для передачи в JSON."""
+        formulas = self._count_formulas()
+        return {
+            "time": self.total_time,
+            "cells": [
+                {
+                    "column": cell_index.column,
+                    "row": cell_index.row,
+                    "shape": self._cell_shapes[cell_index],
+                    **stats.as_dict(),
+                }
+                for cell_index, stats in self.top_cells(size)
+            ],
+            "shapes": [
+                {"shape": shape, "formulas": formulas[shape], **stats.as_dict()}
+                for shape, stats in self.top_shapes(size)
+            ],
+        }
+
+    def folded(self) -> Iterator[str]:
+        """Стеки в свернутом формате для построения flame graph.
+
+        Каждая строка - ``calculate;<форма>;<ячейка> <микросекунды>``,
+        формат понимают flamegraph.pl и speedscope.
+        """
+        for cell_index, stats in self.cells.items():
+            shape = self._cell_shapes[cell_index].replace(";", ",")
+            yield (
+                f"calculate;{shape};{cell_index.column}{cell_index.row} "
+                f"{round(stats.time * 1000000)}"
+            )
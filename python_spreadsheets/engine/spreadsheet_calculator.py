@@ -1,37 +1,86 @@
-from typing import Dict, List, Optional
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from dataclasses import replace
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 from python_spreadsheets.engine.calculation_context import CalculationContext
-from python_spreadsheets.engine.formula_calculator import (
-    FormulaCalculator,
-    FormulaError,
-)
+from python_spreadsheets.engine.formula_calculator import FormulaCalculator
+from python_spreadsheets.engine.profiler import FormulaProfiler
 from python_spreadsheets.engine.spreadsheet_helpers import CellHelper
 from python_spreadsheets.engine.types import (
+    BoolCell,
+    CalculationResult,
     Cell,
     CellIndex,
+    CellRectangle,
+    Deferred,
+    EmptyCell,
+    ErrorKind,
     ErrorValue,
     FormulaCell,
     NumberCell,
+    TextCell,
 )
 
+FormulaValue = Union[float, str, ErrorValue]
+
+GraphNode = Union[CellIndex, CellRectangle]
+"""Вершина графа зависимостей: формула или диапазон, на который ссылаются формулы."""
+
+FormulaGraph = Tuple[
+    Dict[CellIndex, List[GraphNode]], Dict[CellRectangle, List[CellIndex]]
+]
+
 
 class SpreadsheetCalculator:
     _cell_helper: CellHelper
     _formula_helper: FormulaCalculator
 
     _cells_map: Dict[CellIndex, Cell]
-    _formula_cells: List[CellIndex]
+    _formula_cells: Dict[CellIndex, FormulaCell]
+    _evaluation_order: Optional[Tuple[List[CellIndex], List[CellIndex]]]
+    _dependents: Dict[CellIndex, List[CellIndex]]
+    _range_dependents: Dict[CellRectangle, List[CellIndex]]
+    _formula_rows: Dict[str, List[int]]
+    _formula_graph: Optional[FormulaGraph]
+    _dirty: Set[CellIndex]
     _calculation_context: CalculationContext
+    _profiler: Optional[FormulaProfiler]
 
-    def __init__(self, columns_number: int, rows_number: int):
+    def __init__(
+        self,
+        columns_number: int,
+        rows_number: int,
+        profiler: Optional[FormulaProfiler] = None,
+    ):
         self._cell_helper = CellHelper(
             columns_number=columns_number, rows_number=rows_number
         )
         self._formula_helper = FormulaCalculator()
 
         self._cells_map = {}
-        self._formula_cells = []
+        self._formula_cells = {}
+        self._evaluation_order = None
+        self._dependents = {}
+        self._range_dependents = {}
+        self._formula_rows = {}
+        self._formula_graph = None
+        self._dirty = set()
         self._calculation_context = CalculationContext()
+        self._profiler = profiler
 
     def add_cell(self, column: str, row: int, value: str) -> None:
 
@@ -44,11 +93,76 @@ class SpreadsheetCalculator:
         else:
             self._cells_map[cell_index] = cell
             if isinstance(cell, FormulaCell):
-                self._formula_cells.append(cell_index)
-            if isinstance(cell, NumberCell):
+                try:
+                    cell.dependencies = self._formula_helper.dependencies(cell.input)
+                    cell.ranges = self._formula_helper.ranges(cell.input)
+                except ValueError:
+                    cell.dependencies = []
+                    cell.ranges = []
+                for dependency in cell.dependencies:
+                    self._dependents.setdefault(dependency, []).append(cell_index)
+                for rectangle in cell.ranges:
+                    self._range_dependents.setdefault(rectangle, []).append(cell_index)
+                    self._add_range_bounds(rectangle)
+                insort(self._formula_rows.setdefault(column, []), row)
+                self._formula_cells[cell_index] = cell
+                self._dirty.add(cell_index)
+                self._evaluation_order = None
+                self._formula_graph = None
+            if isinstance(cell, (NumberCell, TextCell, BoolCell, EmptyCell)):
                 self._calculation_context.add_cell(
                     value=cell.value, cell_index=cell_index
                 )
+            self._mark_dependents_dirty(cell_index)
+
+    def _add_range_bounds(self, rectangle: CellRectangle) -> None:
+        """Добавление пустых угловых ячеек диапазона в контекст.
+
+        Угловые ячейки среза - имена в коде формулы, поэтому незаполненный угол
+        в пределах таблицы становится пустой ячейкой, а угол за пределами
+        таблицы остается недопустимым именем.
+        """
+        for corner in rectangle:
+            if corner in self._cells_map:
+                continue
+            try:
+                self._cell_helper.create_cell_index(
+                    column=corner.column, row=corner.row
+                )
+            except ValueError:
+                continue
+            self._calculation_context.add_cell(value=None, cell_index=corner)
+
+    def _get_dependents(self, cell_index: CellIndex) -> Iterator[CellIndex]:
+        """Формулы, ссылающиеся на ячейку по имени или через диапазон."""
+        yield from self._dependents.get(cell_index, ())
+        for rectangle, formula_indexes in self._range_dependents.items():
+            if self._cell_helper.in_range(rectangle, cell_index):
+                yield from formula_indexes
+
+    def _mark_dependents_dirty(self, cell_index: CellIndex) -> None:
+        if len(self._dirty) == len(self._formula_cells):
+            return  # все формулы уже ожидают расчета
+
+        stack = [cell_index]
+        while stack:
+            for dependent in self._get_dependents(stack.pop()):
+                if dependent not in self._dirty:
+                    self._dirty.add(dependent)
+                    stack.append(dependent)
+
+    def _get_downstream_formulas(
+        self, cell_indexes: Iterable[CellIndex]
+    ) -> Set[CellIndex]:
+        """Формулы, прямо или косвенно зависящие от ячеек."""
+        downstream: Set[CellIndex] = set()
+        stack = list(cell_indexes)
+        while stack:
+            for dependent in self._get_dependents(stack.pop()):
+                if dependent not in downstream:
+                    downstream.add(dependent)
+                    stack.append(dependent)
+        return downstream
 
     @property
     def cells(self) -> Dict[CellIndex, Cell]:
@@ -58,16 +172,614 @@ class SpreadsheetCalculator:
         cell = self._cells_map.get(CellIndex(column, row))
         return cell
 
-    def calculate(self) -> None:
-        for formula_index in self._formula_cells:
-            formula = self._cells_map[formula_index]
-            if isinstance(formula, FormulaCell):
-                try:
-                    formula.value = self._formula_helper.calculate(
-                        source=formula.input,
-                        calculation_context=self._calculation_context,
+    @property
+    def errors(self) -> Dict[CellIndex, ErrorValue]:
+        """Формулы с ошибками; ячейка, где ошибка возникла, в ``ErrorValue.cause``."""
+        return {
+            formula_index: formula.value
+            for formula_index, formula in self._formula_cells.items()
+            if isinstance(formula.value, ErrorValue)
+        }
+
+    def get_root_causes(self) -> Dict[CellIndex, List[CellIndex]]:
+        """Ячейки, в которых возникли ошибки, и формулы, на которые они повлияли.
+
+        Returns: Для каждой исходной ячейки с ошибкой - зависимые от нее формулы
+                 с ошибками
+        """
+        root_causes: Dict[CellIndex, List[CellIndex]] = {}
+        for formula_index, error in self.errors.items():
+            if error.cause is None or error.cause == formula_index:
+                root_causes.setdefault(formula_index, [])
+            else:
+                root_causes.setdefault(error.cause, []).append(formula_index)
+        return root_causes
+
+    @staticmethod
+    def _get_dependencies(formula: FormulaCell) -> List[CellIndex]:
+        if isinstance(formula.dependencies, Deferred):
+            return []
+        return formula.dependencies
+
+    @staticmethod
+    def _get_ranges(formula: FormulaCell) -> List[CellRectangle]:
+        if isinstance(formula.ranges, Deferred):
+            return []
+        return formula.ranges
+
+    def _get_range_formulas(self, rectangle: CellRectangle) -> Iterator[CellIndex]:
+        """Формулы внутри прямоугольного диапазона."""
+        start, stop = rectangle
+        for column, rows in self._formula_rows.items():
+            if not self._cell_helper.in_range(
+                rectangle, CellIndex(column=column, row=start.row)
+            ):
+                continue
+            for position in range(
+                bisect_left(rows, start.row), bisect_right(rows, stop.row)
+            ):
+                yield CellIndex(column=column, row=rows[position])
+
+    def _get_formula_graph(self) -> FormulaGraph:
+        """Граф зависимостей между формулами.
+
+        Формула зависит от формул, на которые ссылается по имени, и от своих
+        диапазонов, а каждый различный диапазон - от формул внутри него.
+        Диапазоны не раскрываются в зависимости каждой формулы, поэтому
+        количество ребер не растет как произведение количества формул
+        с диапазонами на количество формул в диапазоне.
+
+        Returns: Входы каждой формулы и формулы внутри каждого диапазона
+        """
+        if self._formula_graph is not None:
+            return self._formula_graph
+
+        formula_inputs: Dict[CellIndex, List[GraphNode]] = {}
+        range_formulas: Dict[CellRectangle, List[CellIndex]] = {}
+        for formula_index, formula in self._formula_cells.items():
+            inputs: Dict[GraphNode, None] = dict.fromkeys(
+                dependency
+                for dependency in self._get_dependencies(formula)
+                if dependency in self._formula_cells
+            )
+            for rectangle in self._get_ranges(formula):
+                inputs[rectangle] = None
+                if rectangle not in range_formulas:
+                    range_formulas[rectangle] = list(
+                        self._get_range_formulas(rectangle)
+                    )
+            formula_inputs[formula_index] = list(inputs)
+
+        self._formula_graph = (formula_inputs, range_formulas)
+        return self._formula_graph
+
+    def _depends_on(self, formula: FormulaCell, cell_index: CellIndex) -> bool:
+        return cell_index in self._get_dependencies(formula) or any(
+            self._cell_helper.in_range(rectangle, cell_index)
+            for rectangle in self._get_ranges(formula)
+        )
+
+    def _get_evaluation_order(self) -> Tuple[List[CellIndex], List[CellIndex]]:
+        """Порядок вычисления формул.
+
+        Каждая формула следует за формулами, на которые она ссылается.
+
+        Returns: Упорядоченные формулы и формулы с циклическими ссылками
+        """
+        if self._evaluation_order is not None:
+            return self._evaluation_order
+
+        formula_inputs, range_formulas = self._get_formula_graph()
+
+        dependents: Dict[GraphNode, List[GraphNode]] = {}
+        unresolved: Dict[GraphNode, int] = {}
+
+        for formula_index, inputs in formula_inputs.items():
+            unresolved[formula_index] = len(inputs)
+            for node in inputs:
+                dependents.setdefault(node, []).append(formula_index)
+
+        for rectangle, formula_indexes in range_formulas.items():
+            unresolved[rectangle] = len(formula_indexes)
+            for formula_index in formula_indexes:
+                dependents.setdefault(formula_index, []).append(rectangle)
+
+        ready: Deque[GraphNode] = deque(
+            node for node, count in unresolved.items() if not count
+        )
+        order = []
+        while ready:
+            node = ready.popleft()
+            if not isinstance(node, CellRectangle):
+                order.append(node)
+            for dependent in dependents.get(node, ()):
+                unresolved[dependent] -= 1
+                if not unresolved[dependent]:
+                    ready.append(dependent)
+
+        circular = [
+            formula_index
+            for formula_index in formula_inputs
+            if unresolved[formula_index]
+        ]
+
+        self._evaluation_order = (order, circular)
+        return self._evaluation_order
+
+    def _calculate_formula(
+        self, formula_index: CellIndex, calculation_context: CalculationContext
+    ) -> FormulaValue:
+        formula = self._formula_cells[formula_index]
+
+        if self._profiler is None:
+            value = self._formula_helper.evaluate(
+                source=formula.input, calculation_context=calculation_context
+            )
+        else:
+            started = time.perf_counter()
+            value = self._formula_helper.evaluate(
+                source=formula.input, calculation_context=calculation_context
+            )
+            duration = time.perf_counter() - started
+            self._profiler.record(
+                formula_index,
+                source=formula.input,
+                duration=duration,
+                range_cells=sum(
+                    calculation_context.count_cells(rectangle)
+                    for rectangle in self._get_ranges(formula)
+                ),
+            )
+
+        if isinstance(value, ErrorValue):
+            return replace(value, cause=formula_index)
+        return value
+
+    @staticmethod
+    def _create_circular_error(formula_index: CellIndex) -> ErrorValue:
+        return ErrorValue(
+            kind=ErrorKind.CIRCULAR_REFERENCE,
+            message="Circular reference",
+            cause=formula_index,
+        )
+
+    def _calculate_formulas(
+        self,
+        formula_indexes: Iterable[CellIndex],
+        calculation_context: CalculationContext,
+        failed: Dict[CellIndex, ErrorValue],
+    ) -> Iterator[Tuple[CellIndex, FormulaValue]]:
+        """Последовательное вычисление формул в контексте.
+
+        Значения вычисленных формул добавляются в контекст для зависимых формул.
+        Формулы, ссылающиеся на ячейки из ``failed``, не вычисляются: ошибка
+        распространяется на них как значение с исходной причиной, а сами они
+        добавляются в ``failed``.
+        """
+        range_errors: Dict[CellRectangle, Optional[Tuple[CellIndex, ErrorValue]]] = {}
+        for formula_index in formula_indexes:
+            value: Optional[FormulaValue] = None
+            failed_dependency = self._find_failed_dependency(
+                formula_index, failed=failed, range_errors=range_errors
+            )
+            if failed_dependency is not None:
+                dependency, dependency_error = failed_dependency
+                value = replace(
+                    dependency_error, message=f"Error in dependency {dependency}"
+                )
+            else:
+                value = self._calculate_formula(
+                    formula_index, calculation_context=calculation_context
+                )
+
+            if isinstance(value, ErrorValue):
+                failed[formula_index] = value
+            else:
+                failed.pop(formula_index, None)
+                calculation_context.add_cell(value=value, cell_index=formula_index)
+
+            yield formula_index, value
+
+    def _find_failed_dependency(
+        self,
+        formula_index: CellIndex,
+        failed: Mapping[CellIndex, ErrorValue],
+        range_errors: Dict[CellRectangle, Optional[Tuple[CellIndex, ErrorValue]]],
+    ) -> Optional[Tuple[CellIndex, ErrorValue]]:
+        """Первая формула с ошибкой среди зависимостей формулы.
+
+        Формулы вычисляются в порядке зависимостей, поэтому к моменту
+        обращения к диапазону все формулы внутри него уже вычислены,
+        и ошибка диапазона ищется один раз и запоминается в ``range_errors``.
+        """
+        if not failed:
+            return None
+
+        formula_inputs, range_formulas = self._get_formula_graph()
+        for node in formula_inputs[formula_index]:
+            if isinstance(node, CellRectangle):
+                if node not in range_errors:
+                    range_errors[node] = next(
+                        (
+                            (dependency, failed[dependency])
+                            for dependency in range_formulas[node]
+                            if dependency in failed
+                        ),
+                        None,
+                    )
+                failed_dependency = range_errors[node]
+                if failed_dependency is not None:
+                    return failed_dependency
+            else:
+                dependency_error = failed.get(node)
+                if dependency_error is not None:
+                    return node, dependency_error
+
+        return None
+
+    @staticmethod
+    def _format_value(value: FormulaValue) -> str:
+        if isinstance(value, ErrorValue):
+            return value.message
+        if isinstance(value, bool):
+            return str(value).upper()
+        return str(value)
+
+    def _schedule(
+        self, order: List[CellIndex], priority: Iterable[CellIndex]
+    ) -> List[CellIndex]:
+        """Порядок вычисления измененных формул.
+
+        Первыми идут приоритетные формулы вместе с формулами, от которых они
+        зависят, затем остальные. Внутри каждой группы формулы упорядочены по
+        глубине зависимостей, поэтому любая формула следует за своими
+        зависимостями.
+        """
+        formula_inputs, range_formulas = self._get_formula_graph()
+
+        depths: Dict[CellIndex, int] = {}
+        range_depths: Dict[CellRectangle, int] = {}
+
+        def get_depth(node: GraphNode) -> int:
+            if not isinstance(node, CellRectangle):
+                return depths.get(node, -1)
+            depth = range_depths.get(node)
+            if depth is None:
+                depth = max(
+                    (
+                        depths[formula_index]
+                        for formula_index in range_formulas[node]
+                        if formula_index in depths
+                    ),
+                    default=-1,
+                )
+                range_depths[node] = depth
+            return depth
+
+        positions: Dict[CellIndex, int] = {}
+        for position, formula_index in enumerate(order):
+            positions[formula_index] = position
+            depths[formula_index] = 1 + max(
+                (get_depth(node) for node in formula_inputs[formula_index]),
+                default=-1,
+            )
+
+        prioritized: Set[CellIndex] = set()
+        visited_ranges: Set[CellRectangle] = set()
+        stack: List[GraphNode] = [index for index in priority if index in self._dirty]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, CellRectangle):
+                if node not in visited_ranges:
+                    visited_ranges.add(node)
+                    stack.extend(
+                        formula_index
+                        for formula_index in range_formulas[node]
+                        if formula_index in self._dirty
                     )
-                    formula.output = str(formula.value)
-                except FormulaError as e:
-                    formula.value = ErrorValue()
-                    formula.output = str(e)
+                continue
+            if node in prioritized or node not in depths:
+                continue
+            prioritized.add(node)
+            stack.extend(
+                dependency
+                for dependency in formula_inputs[node]
+                if isinstance(dependency, CellRectangle) or dependency in self._dirty
+            )
+
+        return sorted(
+            (formula_index for formula_index in order if formula_index in self._dirty),
+            key=lambda formula_index: (
+                formula_index not in prioritized,
+                depths[formula_index],
+                positions[formula_index],
+            ),
+        )
+
+    def calculate(
+        self, time_budget: Optional[float] = None, priority: Iterable[CellIndex] = ()
+    ) -> CalculationResult:
+        """Расчет измененных формул.
+
+        Args:
+            time_budget: время на расчет в секундах; формулы, не уложившиеся
+                         в него, остаются в ожидании до следующего вызова
+            priority: формулы, которые нужно рассчитать в первую очередь
+
+        Returns: Рассчитанные в этом вызове формулы и формулы в ожидании
+        """
+        deadline = None if time_budget is None else time.monotonic() + time_budget
+
+        order, circular = self._get_evaluation_order()
+
+        completed = []
+        for formula_index in circular:
+            if formula_index in self._dirty:
+                formula = self._formula_cells[formula_index]
+                formula.value = self._create_circular_error(formula_index)
+                formula.output = self._format_value(formula.value)
+                self._dirty.discard(formula_index)
+                completed.append(formula_index)
+
+        failed = self.errors
+
+        schedule = self._schedule(order, priority=priority)
+
+        for formula_index, value in self._calculate_formulas(
+            schedule, calculation_context=self._calculation_context, failed=failed
+        ):
+            formula = self._formula_cells[formula_index]
+            formula.value = value
+            formula.output = self._format_value(value)
+            self._dirty.discard(formula_index)
+            completed.append(formula_index)
+
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+
+        pending = [
+            formula_index for formula_index in schedule if formula_index in self._dirty
+        ]
+
+        return CalculationResult(completed=completed, pending=pending)
+
+    def what_if(
+        self, scenarios: Iterable[Mapping[CellIndex, float]]
+    ) -> List[Dict[CellIndex, FormulaValue]]:
+        """Расчет формул для набора сценариев с переопределенными ячейками.
+
+        Каждый сценарий вычисляется в отдельном слое поверх общего контекста
+        таблицы, поэтому ни таблица, ни ее контекст не копируются и не изменяются.
+        Пересчитываются только формулы, зависящие от переопределенных ячеек,
+        значения остальных формул берутся из рассчитанной таблицы.
+
+        Args:
+            scenarios: значения переопределяемых ячеек для каждого сценария
+
+        Returns: Значения формул для каждого сценария
+        Raises:
+            ValueError: при выходе индекса ячейки за границы таблицы
+        """
+        if self._dirty:
+            self.calculate()
+
+        order, _ = self._get_evaluation_order()
+        errors = self.errors
+
+        results = []
+
+        for overrides in scenarios:
+            scenario_context = self._calculation_context.overlay()
+            for cell_index, override in overrides.items():
+                self._cell_helper.create_cell_index(
+                    column=cell_index.column, row=cell_index.row
+                )
+                scenario_context.add_cell(value=override, cell_index=cell_index)
+
+            downstream = self._get_downstream_formulas(overrides)
+            formula_indexes = [
+                formula_index
+                for formula_index in order
+                if formula_index in downstream and formula_index not in overrides
+            ]
+            recalculated = set(formula_indexes)
+
+            failed = {
+                formula_index: error
+                for formula_index, error in errors.items()
+                if formula_index not in recalculated and formula_index not in overrides
+            }
+            scenario_values: Dict[CellIndex, FormulaValue] = {
+                formula_index: formula.value
+                for formula_index, formula in self._formula_cells.items()
+                if formula_index not in overrides
+                and not isinstance(formula.value, Deferred)
+            }
+            for formula_index, value in self._calculate_formulas(
+                formula_indexes, calculation_context=scenario_context, failed=failed
+            ):
+                scenario_values[formula_index] = value
+
+            results.append(scenario_values)
+
+        return results
+
+    def _get_dependency_cone(
+        self, input_index: CellIndex, target_index: CellIndex
+    ) -> List[CellIndex]:
+        """Формулы, лежащие на путях зависимостей от входной ячейки к целевой.
+
+        Returns: Формулы конуса в порядке вычисления
+        """
+        formula_inputs, range_formulas = self._get_formula_graph()
+
+        ancestors = {target_index}
+        visited_ranges: Set[CellRectangle] = set()
+        stack = [target_index]
+        while stack:
+            for node in formula_inputs[stack.pop()]:
+                if isinstance(node, CellRectangle):
+                    if node in visited_ranges:
+                        continue
+                    visited_ranges.add(node)
+                    dependencies = range_formulas[node]
+                else:
+                    dependencies = [node]
+                for dependency in dependencies:
+                    if dependency not in ancestors:
+                        ancestors.add(dependency)
+                        stack.append(dependency)
+
+        order, _ = self._get_evaluation_order()
+
+        affected: Set[CellIndex] = set()
+        affected_ranges: Dict[CellRectangle, bool] = {}
+
+        def is_affected(node: GraphNode) -> bool:
+            if not isinstance(node, CellRectangle):
+                return node in affected
+            result = affected_ranges.get(node)
+            if result is None:
+                result = any(
+                    formula_index in affected for formula_index in range_formulas[node]
+                )
+                affected_ranges[node] = result
+            return result
+
+        cone = []
+        for formula_index in order:
+            if formula_index in ancestors and (
+                self._depends_on(self._formula_cells[formula_index], input_index)
+                or any(is_affected(node) for node in formula_inputs[formula_index])
+            ):
+                affected.add(formula_index)
+                cone.append(formula_index)
+
+        return cone
+
+    def _get_number_cell(self, cell_index: CellIndex) -> NumberCell:
+        cell = self._cells_map.get(cell_index)
+        if not isinstance(cell, NumberCell):
+            raise ValueError(f"Cell {cell_index} must be a number cell")
+        return cell
+
+    def _create_target_function(
+        self, input_index: CellIndex, target_index: CellIndex
+    ) -> Callable[[float], FormulaValue]:
+        """Функция значения целевой формулы от значения входной ячейки.
+
+        Функция вычисляет только конус зависимостей между ячейками, остальные
+        значения берутся из рассчитанной таблицы.
+        """
+        self._get_number_cell(input_index)
+
+        if target_index not in self._formula_cells:
+            raise ValueError(f"Cell {target_index} must be a formula cell")
+
+        if self._dirty:
+            self.calculate()
+
+        cone = self._get_dependency_cone(
+            input_index=input_index, target_index=target_index
+        )
+        if not cone:
+            cone = [target_index]
+
+        failed = {
+            formula_index: error
+            for formula_index, error in self.errors.items()
+            if formula_index not in cone
+        }
+
+        def target_function(value: float) -> FormulaValue:
+            calculation_context = self._calculation_context.overlay()
+            calculation_context.add_cell(value=value, cell_index=input_index)
+
+            cone_values = dict(
+                self._calculate_formulas(
+                    cone, calculation_context=calculation_context, failed=dict(failed)
+                )
+            )
+            return cone_values[target_index]
+
+        return target_function
+
+    def sweep(
+        self, input_index: CellIndex, values: Iterable[float], target_index: CellIndex
+    ) -> List[FormulaValue]:
+        """Значения целевой формулы для набора значений входной ячейки.
+
+        Args:
+            input_index: индекс числовой ячейки, значение которой перебирается
+            values: значения входной ячейки
+            target_index: индекс целевой формулы
+
+        Returns: Значения целевой формулы для каждого значения входной ячейки
+        Raises:
+            ValueError: если входная ячейка не числовая или целевая не формула
+        """
+        target_function = self._create_target_function(
+            input_index=input_index, target_index=target_index
+        )
+        return [target_function(value) for value in values]
+
+    def goal_seek(
+        self,
+        input_index: CellIndex,
+        target_index: CellIndex,
+        goal: float,
+        tolerance: float = 1e-9,
+        max_iterations: int = 100,
+    ) -> float:
+        """Подбор значения входной ячейки, при котором формула равна цели.
+
+        Используется метод секущих, начиная с текущего значения входной ячейки.
+
+        Args:
+            input_index: индекс подбираемой числовой ячейки
+            target_index: индекс целевой формулы
+            goal: требуемое значение целевой формулы
+            tolerance: допустимое отклонение от требуемого значения
+            max_iterations: максимальное количество итераций
+
+        Returns: Найденное значение входной ячейки
+        Raises:
+            ValueError: если решение не найдено
+        """
+        target_function = self._create_target_function(
+            input_index=input_index, target_index=target_index
+        )
+
+        def residual(value: float) -> float:
+            target_value = target_function(value)
+            if isinstance(target_value, ErrorValue):
+                raise ValueError(
+                    f"Cell {target_index} has an error for {input_index} = {value}"
+                )
+            if isinstance(target_value, str):
+                raise ValueError(f"Cell {target_index} must have a number value")
+            return target_value - goal
+
+        previous_value = self._get_number_cell(input_index).value
+        previous_residual = residual(previous_value)
+        if abs(previous_residual) <= tolerance:
+            return previous_value
+
+        value = previous_value + max(abs(previous_value), 1.0) * 0.01
+        for _ in range(max_iterations):
+            value_residual = residual(value)
+            if abs(value_residual) <= tolerance:
+                return value
+            if value_residual == previous_residual:
+                break
+
+            previous_value, value = (
+                value,
+                value
+                - value_residual
+                * (value - previous_value)
+                / (value_residual - previous_residual),
+            )
+            previous_residual = value_residual
+
+        raise ValueError(f"Goal seek for cell {target_index} did not converge")
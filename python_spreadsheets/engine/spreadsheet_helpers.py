@@ -1,10 +1,14 @@
+import re
 import string
-from typing import Optional, Set
+from typing import Optional
 
 from python_spreadsheets.engine.types import (
+    BoolCell,
     Cell,
     CellIndex,
+    CellRectangle,
     Deferred,
+    EmptyCell,
     FormulaCell,
     NumberCell,
     TextCell,
@@ -12,6 +16,13 @@ from python_spreadsheets.engine.types import (
 
 COLUMN_ALPHABET = string.ascii_lowercase
 
+CELL_NAME_PATTERN = re.compile(r"([a-z]+)([1-9][0-9]*)")
+
+MAX_ROWS_NUMBER = 1048576
+MAX_COLUMNS_NUMBER = 16384
+
+BOOL_VALUES = {"true": True, "false": False}
+
 
 class RowHelper:
     _max_row: int
@@ -20,7 +31,7 @@ class RowHelper:
         self._max_row = rows_number
 
     def validate_row(self, row: int) -> None:
-        if not (1 <= row < self._max_row):
+        if not (1 <= row <= self._max_row):
             raise ValueError(f"Row out of range (1-{self._max_row})")
 
 
@@ -28,24 +39,19 @@ class ColumnHelper:
     """Набор методов для работы со значениями столбцов."""
 
     _max_column_number: int
-    _allowed_columns: Set[str]
 
     def __init__(self, columns_number: int):
         self._max_column_number = columns_number
 
-        self._allowed_columns = {
-            self.number_to_column(n) for n in range(1, columns_number + 1)
-        }
-
     def validate_column(self, column: str) -> None:
         if not column or not all(c in COLUMN_ALPHABET for c in column):
             raise ValueError(f"Column '{column}' not in valid format ([A-Z]+)")
-        if column not in self._allowed_columns:
+        if self.column_to_number(column) > self._max_column_number:
             max_column = self.number_to_column(self._max_column_number)
             raise ValueError(f"Column out of range (A-{max_column})")
 
     def validate_number(self, number: int) -> None:
-        if not (1 <= number < self._max_column_number):
+        if not (1 <= number <= self._max_column_number):
             raise ValueError(
                 f"Column number out of range (1-{self._max_column_number})"
             )
@@ -97,6 +103,32 @@ class CellHelper:
 
         return CellIndex(column=column, row=row)
 
+    @staticmethod
+    def parse_cell_index(name: str) -> Optional[CellIndex]:
+        """Разбор имени ячейки вида ``a1``.
+
+        Args:
+            name: имя ячейки
+
+        Returns: Индекс ячейки или None, если имя не является именем ячейки
+        """
+        match = CELL_NAME_PATTERN.fullmatch(name)
+        if match is None:
+            return None
+        return CellIndex(column=match.group(1), row=int(match.group(2)))
+
+    @staticmethod
+    def in_range(rectangle: CellRectangle, cell_index: CellIndex) -> bool:
+        """Проверка попадания ячейки в прямоугольный диапазон."""
+        start, stop = rectangle
+        if not start.row <= cell_index.row <= stop.row:
+            return False
+        return (
+            ColumnHelper.column_to_number(start.column)
+            <= ColumnHelper.column_to_number(cell_index.column)
+            <= ColumnHelper.column_to_number(stop.column)
+        )
+
     @staticmethod
     def to_float_or_none(value: str) -> Optional[float]:
         try:
@@ -118,10 +150,17 @@ class CellHelper:
 
         Returns: Объект ячейки соответствующего содержимому типа
         """
+        if not value:
+            return EmptyCell(input=value, output=value)
+
         number = cls.to_float_or_none(value)
-        if number:
+        if number is not None:
             return NumberCell(input=value, output=str(number), value=number)
 
+        boolean = BOOL_VALUES.get(value.lower())
+        if boolean is not None:
+            return BoolCell(input=value, output=str(boolean).upper(), value=boolean)
+
         if cls.is_formula(value):
             return FormulaCell(
                 input=value,
@@ -129,6 +168,7 @@ class CellHelper:
                 value=Deferred(),
                 function=Deferred(),
                 dependencies=Deferred(),
+                ranges=Deferred(),
             )
 
-        return TextCell(input=value, output=value)
+        return TextCell(input=value, output=value, value=value)
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
-from typing import Callable, List, NamedTuple, Union
+from enum import Enum
+from typing import Callable, List, NamedTuple, Optional, Union
 
 
 class Deferred:
@@ -19,6 +20,23 @@ class CellIndex(NamedTuple):
         return self.__str__()
 
 
+class CellRectangle(NamedTuple):
+    """Прямоугольный диапазон ячеек, заданный угловыми ячейками."""
+
+    start: CellIndex
+    stop: CellIndex
+
+
+class CalculationResult(NamedTuple):
+    completed: List[CellIndex]
+    pending: List[CellIndex]
+
+
+CellValue = Union[float, str, bool, None]
+"""Значение ячейки в контексте вычисления: число, текст, логическое значение
+или None для пустой."""
+
+
 class Formula(NamedTuple):
     function: Callable
     dependencies: List[CellIndex]
@@ -37,15 +55,42 @@ class NumberCell(Cell):
 
 @dataclass
 class TextCell(Cell):
-    pass
+    value: str
 
 
+@dataclass
+class BoolCell(Cell):
+    value: bool
+
+
+@dataclass
+class EmptyCell(Cell):
+    value: None = None
+
+
+class ErrorKind(Enum):
+    INVALID_FORMULA = "invalid formula"
+    UNKNOWN_NAME = "unknown name"
+    RUNTIME = "runtime"
+    CIRCULAR_REFERENCE = "circular reference"
+
+
+@dataclass(frozen=True)
 class ErrorValue:
-    pass
+    """Значение формулы, вычисление которой завершилось ошибкой.
+
+    Ошибка распространяется на зависимые формулы как значение, а ``cause``
+    указывает на ячейку, в которой ошибка возникла.
+    """
+
+    kind: ErrorKind
+    message: str
+    cause: Optional[CellIndex] = None
 
 
 @dataclass
 class FormulaCell(Cell):
-    value: Union[Deferred, float, ErrorValue]
+    value: Union[Deferred, float, str, ErrorValue]
     function: Union[Deferred, Callable]
     dependencies: Union[Deferred, List[CellIndex]]
+    ranges: Union[Deferred, List[CellRectangle]]
@@ -1,6 +1,14 @@
+import subprocess
+import sys
+from pathlib import Path
+
 import pytest
 from graphene.test import Client
-from python_spreadsheets.api.application import root_schema
+from python_spreadsheets.api.application import app
+from python_spreadsheets.api.calculation import calculate_cells
+from python_spreadsheets.api.columnar import decode_columnar, encode_columnar
+from python_spreadsheets.api.schema import root_schema
+from starlette.testclient import TestClient
 
 
 @pytest.fixture
@@ -72,3 +80,175 @@ def test_cell_duplicate(client):
         result["errors"][0]["message"]
         == "Error while adding cell #1: Cell a1 already exists"
     )
+
+
+def test_calculate_batch(client):
+    query = """
+    mutation calculateSpreadsheets($spreadsheets: [SpreadsheetInput!]!) {
+      calculateSpreadsheets(inputs: $spreadsheets) {
+        results {
+          spreadsheet {
+            cells {
+              row
+              column
+              output
+            }
+          }
+          error
+        }
+      }
+    }
+    """
+    variables = {
+        "spreadsheets": [
+            {"cells": [{"row": 1, "column": "a", "value": "lambda: 2 + 2"}]},
+            {
+                "cells": [
+                    {"row": 1, "column": "a", "value": "test"},
+                    {"row": 1, "column": "a", "value": "test 2"},
+                ]
+            },
+            {"cells": [{"row": 2, "column": "b", "value": "lambda: 2 * 3"}]},
+        ]
+    }
+
+    result = client.execute(query, variable_values=variables)
+
+    assert "errors" not in result
+
+    assert result["data"]["calculateSpreadsheets"]["results"] == [
+        {
+            "spreadsheet": {"cells": [{"row": 1, "column": "a", "output": "4.0"}]},
+            "error": None,
+        },
+        {
+            "spreadsheet": None,
+            "error": "Error while adding cell #1: Cell a1 already exists",
+        },
+        {
+            "spreadsheet": {"cells": [{"row": 2, "column": "b", "output": "6.0"}]},
+            "error": None,
+        },
+    ]
+
+
+def test_columnar_format():
+    payload = {
+        "strings": ["a", "b", "2", "lambda: a1 * 2"],
+        "columns": [0, 1],
+        "rows": [1, 1],
+        "values": [2, 3],
+    }
+
+    calculated_cells = calculate_cells(decode_columnar(payload))
+
+    assert encode_columnar(calculated_cells) == {
+        "strings": ["a", "2", "2.0", "b", "lambda: a1 * 2", "4.0"],
+        "columns": [0, 3],
+        "rows": [1, 1],
+        "inputs": [1, 4],
+        "outputs": [2, 5],
+    }
+
+
+@pytest.mark.parametrize(
+    "payload",
+    (
+        [],
+        {"strings": [], "columns": [], "rows": []},
+        {"strings": ["a"], "columns": [0, 0], "rows": [1], "values": [0]},
+        {"strings": ["a"], "columns": [0], "rows": [1], "values": [1]},
+        {"strings": ["a"], "columns": 5, "rows": [1], "values": [0]},
+        {"strings": ["a"], "columns": [0], "rows": ["1"], "values": [0]},
+        {"strings": ["a"], "columns": [0], "rows": [1], "values": [-1]},
+        {"strings": [1], "columns": [0], "rows": [1], "values": [0]},
+    ),
+)
+def test_columnar_format_errors(payload):
+    with pytest.raises(ValueError):
+        decode_columnar(payload)
+
+
+def test_columnar_profile():
+    payload = {
+        "strings": ["a", "b", "2", "lambda: sum(s[a1:a2])"],
+        "columns": [0, 0, 1],
+        "rows": [1, 2, 1],
+        "values": [2, 2, 3],
+    }
+
+    response = TestClient(app).post("/columnar?profile=5", json=payload)
+
+    assert response.status_code == 200
+    profile = response.json()["profile"]
+    assert profile["cells"] == [
+        {
+            "column": "b",
+            "row": 1,
+            "shape": "lambda: sum(s[RC[-1]:R[1]C[-1]])",
+            "time": profile["time"],
+            "calls": 1,
+            "range_cells": 2,
+        }
+    ]
+    assert profile["shapes"][0]["formulas"] == 1
+    assert profile["folded"][0].startswith(
+        "calculate;lambda: sum(s[RC[-1]:R[1]C[-1]]);b1 "
+    )
+
+    response = TestClient(app).post("/columnar", json=payload)
+
+    assert "profile" not in response.json()
+
+    for profile in ("yes", "-3"):
+        response = TestClient(app).post(f"/columnar?profile={profile}", json=payload)
+
+        assert response.status_code == 400
+
+
+def test_columnar_invalid_payload():
+    response = TestClient(app).post(
+        "/columnar",
+        json={"strings": ["a"], "columns": [0], "rows": ["1"], "values": [0]},
+    )
+
+    assert response.status_code == 400
+
+
+def test_schema_artifact():
+    schema_path = Path(__file__).parent.parent / "schema.graphql"
+
+    assert schema_path.read_text() == str(root_schema)
+
+
+def test_application_without_graphene():
+    code = (
+        "import sys\n"
+        "from python_spreadsheets.api.application import app\n"
+        "assert 'graphene' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_tsv_streaming():
+    input_path = Path(__file__).parent / "spreadsheet_cases" / "sum_formula"
+
+    def upload():
+        with open(input_path / "input.tsv", "rb") as tsv_file:
+            while True:
+                chunk = tsv_file.read(5)
+                if not chunk:
+                    break
+                yield chunk
+
+    response = TestClient(app).post("/tsv", data=upload())
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/tab-separated-values")
+    assert response.text == (input_path / "expected.tsv").read_text()
+
+
+def test_tsv_streaming_errors():
+    response = TestClient(app).post("/tsv", data=b"\ta\n1\t\xff\n")
+
+    assert response.status_code == 400
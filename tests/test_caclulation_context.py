@@ -3,6 +3,8 @@ from python_spreadsheets.engine.calculation_context import (
     CalculationContext,
     CellSlicer,
     CellVariable,
+    TextPool,
+    TypedColumn,
 )
 from python_spreadsheets.engine.types import CellIndex
 
@@ -41,7 +43,7 @@ def test_vertical_slice(slicer, cells):
 
     slice_result = slicer[start:stop]
 
-    assert slice_result == expected_range
+    assert list(slice_result) == expected_range
 
 
 def test_horizontal_slice(slicer, cells):
@@ -51,7 +53,7 @@ def test_horizontal_slice(slicer, cells):
 
     slice_result = slicer[start:stop]
 
-    assert slice_result == expected_range
+    assert list(slice_result) == expected_range
 
 
 cell_mock = CellVariable(0, CellIndex("a", 1))
@@ -82,8 +84,313 @@ def test_calculation_context():
     assert context_dict["s"]
     assert type(context_dict["s"]) == CellSlicer
 
-    expected_builtins = ("sum", "min", "max")
+    expected_builtins = (
+        "sum",
+        "min",
+        "max",
+        "avg",
+        "count",
+        "sumif",
+        "sumproduct",
+        "match",
+        "vlookup",
+    )
 
     for builtin in expected_builtins:
         assert context_dict[builtin]
         assert callable(context_dict[builtin])
+
+
+def test_calculation_context_overlay():
+    calculation_context = CalculationContext()
+    calculation_context.add_cell(1.0, cell_index=CellIndex("a", 1))
+    calculation_context.add_cell(2.0, cell_index=CellIndex("a", 2))
+
+    overlay = calculation_context.overlay()
+    overlay.add_cell(10.0, cell_index=CellIndex("a", 1))
+
+    nested_overlay = overlay.overlay()
+    nested_overlay.add_cell(20.0, cell_index=CellIndex("a", 3))
+
+    assert overlay.context["a1"] == 10.0
+    assert overlay.context["a2"] == 2.0
+    assert list(
+        overlay.context["s"][overlay.context["a1"] : overlay.context["a2"]]
+    ) == [10.0, 2.0]
+    assert calculation_context.context["a1"] == 1.0
+    assert "a3" not in calculation_context.names
+    assert "a3" not in overlay.names
+    assert {"a1", "a2", "a3", "sum"} <= nested_overlay.names
+
+
+@pytest.fixture
+def lookup_context():
+    calculation_context = CalculationContext()
+    for row, (key, value) in enumerate(((10, 1), (20, 2), (30, 3), (20, 4)), start=1):
+        calculation_context.add_cell(key, cell_index=CellIndex("a", row))
+        calculation_context.add_cell(value, cell_index=CellIndex("b", row))
+    return calculation_context
+
+
+def test_lookup_functions(lookup_context):
+    context = lookup_context.context
+    table = context["s"][context["a1"] : context["b4"]]
+    keys = context["s"][context["a1"] : context["a4"]]
+
+    assert context["vlookup"](20, table, 2) == 2
+    assert context["vlookup"](20, table[1:], 2) == 2
+    assert context["vlookup"](30, table, 1) == 30
+    assert context["match"](30, keys) == 3
+    assert context["match"](20, keys[2:]) == 2
+
+    for call in (
+        lambda: context["vlookup"](40, table, 2),
+        lambda: context["vlookup"](20, table, 3),
+        lambda: context["match"](40, keys),
+    ):
+        with pytest.raises(LookupError):
+            call()
+
+
+def test_lookup_index_invalidation(lookup_context):
+    context = lookup_context.context
+    keys = context["s"][context["a1"] : context["a4"]]
+
+    assert context["match"](20, keys) == 2
+
+    lookup_context.add_cell(40, cell_index=CellIndex("a", 2))
+
+    assert context["match"](40, keys) == 2
+    assert context["match"](20, keys) == 4
+
+
+def test_lookup_in_overlay(lookup_context):
+    overlay = lookup_context.overlay()
+    overlay.add_cell(50, cell_index=CellIndex("a", 1))
+    overlay.add_cell(30, cell_index=CellIndex("a", 4))
+
+    context = overlay.context
+    keys = context["s"][context["a1"] : context["a4"]]
+
+    assert context["match"](50, keys) == 1
+    assert context["match"](30, keys) == 3
+    assert context["match"](20, keys) == 2
+    assert lookup_context.context["match"](20, keys) == 2
+
+    with pytest.raises(LookupError):
+        context["match"](10, keys)
+
+
+def test_sparse_slice():
+    slicer = CellSlicer()
+    cells = (
+        CellVariable(1.0, CellIndex("a", 1)),
+        CellVariable(2.0, CellIndex("a", 1000000)),
+        CellVariable(3.0, CellIndex("xfd", 500)),
+        CellVariable(4.0, CellIndex("b", 2)),
+    )
+    for cell in cells:
+        slicer.add_cell(cell)
+
+    slice_result = slicer[cells[0] : CellVariable(0, CellIndex("xfd", 1048576))]
+
+    assert list(slice_result) == [cells[0], cells[1], cells[3], cells[2]]
+    assert list(slicer[cells[3] : cells[2]]) == [cells[3], cells[2]]
+    assert list(slicer[cells[0] : cells[0]]) == [cells[0]]
+    assert list(slicer[cells[1] : cells[1]]) == [cells[1]]
+    assert list(slicer[cells[3] : CellVariable(0, CellIndex("c", 3))]) == [cells[3]]
+
+    overlay = CellSlicer(parent=slicer)
+    overlay.add_cell(CellVariable(5.0, CellIndex("a", 3)))
+
+    assert list(overlay[cells[0] : cells[1]]) == [1.0, 5.0, 2.0]
+
+
+def test_sparse_lookup():
+    calculation_context = CalculationContext()
+    calculation_context.add_cell(10, cell_index=CellIndex("a", 2))
+    calculation_context.add_cell(20, cell_index=CellIndex("a", 5))
+    calculation_context.add_cell(200, cell_index=CellIndex("c", 5))
+
+    context = calculation_context.context
+    start = CellVariable(0, CellIndex("a", 1))
+    stop = CellVariable(0, CellIndex("c", 10))
+    table = context["s"][start:stop]
+
+    assert context["vlookup"](20, table, 3) == 200
+    assert context["match"](20, table) == 5
+
+
+def test_typed_column():
+    column = TypedColumn(TextPool())
+    column.set(5, "text")
+    column.set(1, 1.5)
+    column.set(3, None)
+    column.set(2, 0.0)
+
+    assert column.get(1) == 1.5
+    assert column.get(2) == 0.0
+    assert column.get(3) is None
+    assert column.get(5) == "text"
+    assert list(column.rows()) == [1, 2, 3, 5]
+    assert column.count(2, 5) == 2
+    assert list(column.items(2, 5)) == [(2, 0.0), (5, "text")]
+    assert list(column.items()) == [(1, 1.5), (2, 0.0), (5, "text")]
+
+    column.set(4, True)
+
+    assert column.get(4) is True
+    assert column.count(1, 5) == 4
+
+    column.set(5, 2.0)
+
+    assert column.get(5) == 2.0
+    with pytest.raises(KeyError):
+        column.get(6)
+
+
+def test_text_pool():
+    text_pool = TextPool()
+
+    assert text_pool.add("text") == text_pool.add("te" + "xt") == 0
+    assert text_pool.add("other") == 1
+    assert text_pool.get(0) == "text"
+
+
+def test_mixed_type_cells():
+    calculation_context = CalculationContext()
+    calculation_context.add_cell("x", cell_index=CellIndex("a", 1))
+    calculation_context.add_cell(None, cell_index=CellIndex("a", 2))
+    calculation_context.add_cell(2.0, cell_index=CellIndex("a", 3))
+    calculation_context.add_cell("y", cell_index=CellIndex("b", 3))
+
+    context = calculation_context.context
+
+    assert context["a1"] == "x"
+    assert context["a1"].index == CellIndex("a", 1)
+    assert context["a2"] == 0.0
+    assert {"a1", "a2", "a3", "b3"} <= calculation_context.names
+    assert "a4" not in calculation_context.names
+
+    cells = context["s"][context["a1"] : context["b3"]]
+
+    assert list(cells) == ["x", 2.0, "y"]
+    assert context["match"]("y", cells) == 6
+    assert context["vlookup"]("x", cells, 1) == "x"
+    assert context["count"](cells) == 1
+
+
+def test_lazy_range():
+    slicer = CellSlicer()
+    slicer.add_value(CellIndex("a", 1), 1.0)
+    slicer.add_value(CellIndex("a", 2), "text")
+    slicer.add_value(CellIndex("b", 1000000), 3.0)
+    slicer.add_value(CellIndex("b", 5), None)
+
+    cells = slicer[
+        CellVariable(0, CellIndex("a", 1)) : CellVariable(0, CellIndex("xfd", 1048576))
+    ]
+
+    assert repr(cells) == "CellRange(a1:xfd1048576)"
+    assert len(cells) == 3
+    assert 3.0 in cells
+    assert "text" in cells
+    assert 2.0 not in cells
+    assert list(cells) == [1.0, "text", 3.0]
+    assert cells[2].index == CellIndex("b", 1000000)
+    assert cells[-1] == 3.0
+    assert cells[1] == "text"
+    assert cells[:2] == [1.0, "text"]
+    with pytest.raises(IndexError):
+        cells[3]
+    with pytest.raises(IndexError):
+        cells[-4]
+    assert list(cells.numbers()) == [1.0, 3.0]
+
+    overlay = CellSlicer(parent=slicer)
+    overlay.add_value(CellIndex("a", 2), 2.0)
+    cells = overlay[
+        CellVariable(0, CellIndex("a", 1)) : CellVariable(0, CellIndex("b", 5))
+    ]
+
+    assert len(cells) == 2
+    assert list(cells) == [1.0, 2.0]
+    assert cells[1].index == CellIndex("a", 2)
+
+
+def test_range_functions():
+    calculation_context = CalculationContext()
+    for row, value in enumerate((3.0, 1.0, 2.0), start=1):
+        calculation_context.add_cell(value, cell_index=CellIndex("a", row))
+
+    context = calculation_context.context
+    cells = context["s"][context["a1"] : context["a3"]]
+
+    assert context["sum"](cells) == 6.0
+    assert context["min"](cells) == 1.0
+    assert context["max"](cells) == 3.0
+    assert context["max"](context["a1"], 4.0) == 4.0
+    assert context["avg"](cells) == 2.0
+
+
+@pytest.mark.parametrize(
+    "first, second, sumproduct_result, sumif_result",
+    (
+        ((1, "", 3, 4), (10, 20, None, 40), 170.0, 0),
+        ((1, 2, 3, 4), (10, None, 30, 40), 260.0, 30.0),
+        ((None, 2, 3, ""), (10, 20, 30, 40), 130.0, 30.0),
+        ((1, "x", 3, 4), (10, 20, "y", 40), 170.0, 0),
+    ),
+)
+def test_paired_ranges_with_gaps(first, second, sumproduct_result, sumif_result):
+    # None - отсутствующая ячейка, "" - явно пустая
+    calculation_context = CalculationContext()
+    for column, values in (("a", first), ("b", second)):
+        for row, value in enumerate(values, start=1):
+            if value is not None:
+                calculation_context.add_cell(
+                    value if value != "" else None, cell_index=CellIndex(column, row)
+                )
+
+    context = calculation_context.context
+
+    def get_range(start, stop):
+        return context["s"][CellVariable(0, start) : CellVariable(0, stop)]
+
+    first_range = get_range(CellIndex("a", 1), CellIndex("a", 4))
+    second_range = get_range(CellIndex("b", 1), CellIndex("b", 4))
+
+    assert context["sumproduct"](first_range, second_range) == sumproduct_result
+    assert context["sumif"](first_range, 3, second_range) == sumif_result
+    assert context["sumproduct"](second_range, [1, 1, 1, 1]) == sum(
+        value for value in second if isinstance(value, int)
+    )
+    with pytest.raises(TypeError):
+        context["sumproduct"](
+            first_range, get_range(CellIndex("b", 1), CellIndex("b", 3))
+        )
+
+
+def test_bool_cells():
+    calculation_context = CalculationContext()
+    calculation_context.add_cell(True, cell_index=CellIndex("a", 1))
+    calculation_context.add_cell(2.0, cell_index=CellIndex("a", 2))
+    calculation_context.add_cell(False, cell_index=CellIndex("a", 3))
+
+    context = calculation_context.context
+    cells = context["s"][context["a1"] : context["a3"]]
+
+    assert str(context["a1"]) == "TRUE"
+    assert context["a1"] + 1 == 2
+    assert context["a1"].index == CellIndex("a", 1)
+    assert list(cells) == [True, 2.0, False]
+    assert context["count"](cells) == 1
+    assert context["sum"](cells) == 2.0
+    assert context["sum"](list(cells.numbers())) == 2.0
+    assert context["min"](cells) == 2.0
+    assert context["max"](cells) == 2.0
+    assert context["count"](list(cells)) == 1
+    assert context["match"](True, cells) == 1
+    assert context["match"](context["a3"], cells) == 3
+    with pytest.raises(LookupError):
+        context["match"](1, cells)
@@ -4,6 +4,7 @@ from python_spreadsheets.engine.formula_calculator import (
     FormulaCalculator,
     FormulaRuntimeError,
 )
+from python_spreadsheets.engine.types import ErrorKind, ErrorValue
 
 
 @pytest.mark.parametrize(
@@ -30,3 +31,31 @@ def test_formula_runtime_error():
         FormulaCalculator.calculate(
             source="lambda: None", calculation_context=CalculationContext()
         )
+
+
+@pytest.mark.parametrize(
+    "source, kind",
+    (
+        ("lambda: (", ErrorKind.INVALID_FORMULA),
+        ("import os", ErrorKind.INVALID_FORMULA),
+        ("lambda: a1 + 1", ErrorKind.UNKNOWN_NAME),
+        ("lambda: None", ErrorKind.RUNTIME),
+        ("lambda: 1 / 0", ErrorKind.RUNTIME),
+    ),
+)
+def test_formula_evaluation_error_value(source, kind):
+    value = FormulaCalculator.evaluate(
+        source=source, calculation_context=CalculationContext()
+    )
+
+    assert type(value) == ErrorValue
+    assert value.kind == kind
+
+
+def test_formula_compilation_cache():
+    compiled_formula = FormulaCalculator.compile(source="lambda: a1 + sum(s[a1:a2])")
+
+    assert compiled_formula is FormulaCalculator.compile(
+        source="lambda: a1 + sum(s[a1:a2])"
+    )
+    assert compiled_formula.names == {"a1", "a2", "s", "sum"}
@@ -0,0 +1,85 @@
+import pytest
+from python_spreadsheets.engine.profiler import FormulaProfiler, normalize_formula
+from python_spreadsheets.engine.spreadsheet_calculator import SpreadsheetCalculator
+from python_spreadsheets.engine.types import CellIndex
+
+
+@pytest.mark.parametrize(
+    "source, cell_index, shape",
+    (
+        ("lambda: a2 * 2", CellIndex("b", 2), "lambda: RC[-1] * 2"),
+        ("lambda: a3 * 2", CellIndex("b", 3), "lambda: RC[-1] * 2"),
+        (
+            "lambda: sum(s[a1:c10])",
+            CellIndex("b", 1),
+            "lambda: sum(s[RC[-1]:R[9]C[1]])",
+        ),
+        ("lambda: b1 + 'a1'", CellIndex("b", 2), "lambda: R[-1]C + 'a1'"),
+        ("lambda: sum + avg", CellIndex("a", 1), "lambda: sum + avg"),
+        ("lambda: a1 +(", CellIndex("b", 1), "lambda: RC[-1] +("),
+    ),
+)
+def test_normalize_formula(source, cell_index, shape):
+    assert normalize_formula(source, cell_index) == shape
+
+
+def test_profiler_report():
+    profiler = FormulaProfiler()
+    profiler.record(CellIndex("b", 1), "lambda: a1 * 2", duration=0.5, range_cells=0)
+    profiler.record(CellIndex("b", 2), "lambda: a2 * 2", duration=1.0, range_cells=0)
+    profiler.record(
+        CellIndex("c", 1), "lambda: sum(s[a1:a2])", duration=0.25, range_cells=2
+    )
+    profiler.record(
+        CellIndex("c", 1), "lambda: sum(s[a1:a2])", duration=0.25, range_cells=2
+    )
+
+    assert profiler.total_time == 2.0
+    assert [cell_index for cell_index, _ in profiler.top_cells(2)] == [
+        CellIndex("b", 2),
+        CellIndex("b", 1),
+    ]
+    assert profiler.cells[CellIndex("c", 1)].calls == 2
+    assert profiler.cells[CellIndex("c", 1)].range_cells == 4
+
+    (shape, stats), *_ = profiler.top_shapes(1)
+    assert shape == "lambda: RC[-1] * 2"
+    assert stats.time == 1.5
+    assert stats.calls == 2
+
+    report = profiler.report(size=1)
+    assert "formulas: 3, shapes: 2" in report
+    assert "b2: lambda: RC[-1] * 2" in report
+    assert "c1" not in report
+
+    assert list(profiler.folded()) == [
+        "calculate;lambda: RC[-1] * 2;b1 500000",
+        "calculate;lambda: RC[-1] * 2;b2 1000000",
+        "calculate;lambda: sum(s[RC[-2]:R[1]C[-2]]);c1 500000",
+    ]
+
+
+def test_calculation_profile():
+    profiler = FormulaProfiler()
+    spreadsheet_calculator = SpreadsheetCalculator(
+        columns_number=26, rows_number=100, profiler=profiler
+    )
+    for row in range(1, 4):
+        spreadsheet_calculator.add_cell(column="a", row=row, value=str(row))
+        spreadsheet_calculator.add_cell(
+            column="b", row=row, value=f"lambda: sum(s[a1:a{row}])"
+        )
+
+    spreadsheet_calculator.calculate()
+    spreadsheet_calculator.sweep(
+        CellIndex("a", 1), values=[10.0, 20.0], target_index=CellIndex("b", 3)
+    )
+
+    assert set(profiler.cells) == {
+        CellIndex("b", 1),
+        CellIndex("b", 2),
+        CellIndex("b", 3),
+    }
+    assert profiler.cells[CellIndex("b", 3)].calls == 3
+    assert profiler.cells[CellIndex("b", 3)].range_cells == 9
+    assert len(profiler.shapes) == 3
@@ -0,0 +1,147 @@
+import pytest
+from python_spreadsheets.api import calculation
+from python_spreadsheets.api.application import app
+from python_spreadsheets.api.recording import (
+    ADD_CELL,
+    CALCULATE,
+    CREATE,
+    Event,
+    RecordingSpreadsheetCalculator,
+    SessionRecorder,
+    read_events,
+)
+from python_spreadsheets.api.replay import (
+    main,
+    percentile,
+    replay_application,
+    replay_calculator,
+)
+
+
+@pytest.fixture
+def session_log(tmp_path):
+    log_path = tmp_path / "sessions.log"
+
+    recorder = SessionRecorder(log_path)
+    for _ in range(3):
+        spreadsheet = RecordingSpreadsheetCalculator(
+            columns_number=26, rows_number=100, recorder=recorder
+        )
+        spreadsheet.add_cell(column="a", row=1, value="2")
+        spreadsheet.add_cell(column="a", row=2, value="lambda: a1 * 2")
+        spreadsheet.calculate()
+        spreadsheet.add_cell(column="a", row=3, value="lambda: a2 + 1")
+        spreadsheet.calculate()
+    recorder.close()
+
+    return log_path
+
+
+def test_recording(session_log):
+    events = list(read_events(session_log))
+
+    assert len(events) == 18
+    assert len({event.sheet for event in events}) == 3
+    assert [event.operation for event in events[:6]] == [
+        CREATE,
+        ADD_CELL,
+        ADD_CELL,
+        CALCULATE,
+        ADD_CELL,
+        CALCULATE,
+    ]
+    assert events[0].arguments == [26, 100]
+    assert events[2].arguments == ["a", 2, "lambda: a1 * 2"]
+
+
+def test_recording_errors(tmp_path):
+    log_path = tmp_path / "sessions.log"
+    log_path.write_text('[1,"1:1","create",26,100]\n{}\n')
+
+    with pytest.raises(ValueError):
+        list(read_events(log_path))
+
+
+@pytest.mark.parametrize("concurrency", (1, 2))
+def test_replay_calculator(session_log, concurrency):
+    report = replay_calculator(list(read_events(session_log)), concurrency=concurrency)
+
+    assert report.operations == 18
+    assert report.errors == 0
+    assert len(report.latencies[CALCULATE]) == 6
+    assert report.throughput > 0
+    assert report.peak_memory > 0
+
+
+def test_replay_calculator_errors():
+    events = [
+        Event(time=0, sheet="1:1", operation=ADD_CELL, arguments=["a", 1, "1"]),
+        Event(time=0, sheet="1:2", operation=CREATE, arguments=[26, 100]),
+        Event(time=1, sheet="1:2", operation=ADD_CELL, arguments=["a", 1, "1"]),
+        Event(time=2, sheet="1:2", operation=ADD_CELL, arguments=["a", 1, "2"]),
+    ]
+
+    report = replay_calculator(events, speed=100)
+
+    assert report.errors == 2
+
+
+def test_replay_application(session_log):
+    hits = calculation.result_cache.hits
+
+    report = replay_application(list(read_events(session_log)), app=app, concurrency=2)
+
+    assert report.errors == 0
+    assert list(report.latencies) == [CALCULATE]
+    assert len(report.latencies[CALCULATE]) == 6
+    assert calculation.result_cache.hits == hits
+
+    replay_application(list(read_events(session_log)), app=app, use_cache=True)
+
+    assert calculation.result_cache.hits > hits
+
+
+def test_replay_main(session_log, capsys):
+    main([str(session_log), "--target", "application"])
+
+    assert "calculate latency: p50" in capsys.readouterr().out
+
+
+def test_percentile():
+    values = [5.0, 1.0, 4.0, 2.0, 3.0]
+
+    assert percentile(values, 50) == 3.0
+    assert percentile(values, 90) == 5.0
+    assert percentile(values, 0) == 1.0
+    assert percentile([], 99) == 0.0
+
+
+def test_calculation_recording(tmp_path, monkeypatch):
+    log_path = tmp_path / "sessions.log"
+    monkeypatch.setattr(calculation, "session_recorder", SessionRecorder(log_path))
+
+    calculation.calculate_cells([("a", 1, "39.5"), ("a", 2, "lambda: a1 + 39")])
+
+    events = list(read_events(log_path))
+
+    assert [event.operation for event in events] == [
+        CREATE,
+        ADD_CELL,
+        ADD_CELL,
+        CALCULATE,
+    ]
+
+
+def test_cache_hit_recording(tmp_path, monkeypatch):
+    log_path = tmp_path / "sessions.log"
+    monkeypatch.setattr(calculation, "session_recorder", SessionRecorder(log_path))
+    cells = [("a", 1, "41.5"), ("a", 2, "lambda: a1 + 41")]
+
+    calculation.calculate_cells(cells)
+    calculation.calculate_cells(cells)
+
+    events = list(read_events(log_path))
+
+    assert len({event.sheet for event in events}) == 2
+    assert [event.operation for event in events].count(CALCULATE) == 2
+    assert events[-2].arguments == ["a", 2, "lambda: a1 + 41"]
@@ -0,0 +1,113 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from python_spreadsheets.api import result_cache as result_cache_module
+from python_spreadsheets.api.calculation import create_result_cache
+from python_spreadsheets.api.result_cache import (
+    RESULT_CACHE_DIRECTORY_VARIABLE,
+    RESULT_CACHE_FORMAT_VERSION,
+    FileBackend,
+    MemoryBackend,
+    ResultCache,
+    ResultCacheBackend,
+)
+
+cells = [("a", 1, "2"), ("a", 2, "lambda: a1 * 2")]
+
+calculated_cells = [("a", 1, "2", "2.0"), ("a", 2, "lambda: a1 * 2", "4.0")]
+
+
+@pytest.fixture(params=("memory", "file"))
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryBackend(max_size=2)
+    return FileBackend(directory=tmp_path, max_size=2)
+
+
+def test_cache_hits(backend):
+    result_cache = ResultCache(backend=backend)
+    key = result_cache.key(cells, columns_number=26, rows_number=100)
+
+    assert result_cache.get(key) is None
+
+    result_cache.put(key, calculated_cells)
+
+    assert result_cache.get(key) == calculated_cells
+    assert result_cache.hits == 1
+    assert result_cache.misses == 1
+    assert result_cache.hit_rate == 0.5
+
+
+def test_cache_eviction(backend):
+    backend.put("first", calculated_cells)
+    backend.put("second", calculated_cells)
+    backend.put("third", calculated_cells)
+
+    assert backend.get("first") is None
+    assert backend.get("second") == calculated_cells
+    assert backend.get("third") == calculated_cells
+
+
+def test_backend_interface():
+    with pytest.raises(TypeError):
+        ResultCacheBackend()
+
+
+def test_cache_key():
+    key = ResultCache.key(cells, columns_number=26, rows_number=100)
+
+    assert key == ResultCache.key(list(cells), columns_number=26, rows_number=100)
+    assert key != ResultCache.key(cells, columns_number=26, rows_number=1000)
+    assert key != ResultCache.key(cells[::-1], columns_number=26, rows_number=100)
+
+
+def test_cache_key_depends_on_version(monkeypatch):
+    key = ResultCache.key(cells, columns_number=26, rows_number=100)
+
+    monkeypatch.setattr(result_cache_module, "__version__", "0.0.0")
+
+    assert key != ResultCache.key(cells, columns_number=26, rows_number=100)
+
+
+def test_file_backend_format_version(tmp_path):
+    backend = FileBackend(directory=tmp_path, max_size=2)
+    (tmp_path / "legacy.json").write_text(json.dumps(calculated_cells))
+    (tmp_path / "future.json").write_text(
+        json.dumps({"version": RESULT_CACHE_FORMAT_VERSION + 1, "cells": []})
+    )
+
+    (tmp_path / "partial.json").write_text(
+        json.dumps({"version": RESULT_CACHE_FORMAT_VERSION})
+    )
+
+    assert backend.get("legacy") is None
+    assert backend.get("future") is None
+    assert backend.get("partial") is None
+
+
+def test_file_backend_shared_by_writers(tmp_path):
+    backends = [FileBackend(directory=tmp_path, max_size=8) for _ in range(4)]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(
+            executor.map(
+                lambda backend: backend.put("shared", calculated_cells), backends * 8
+            )
+        )
+
+    assert [backend.get("shared") for backend in backends] == [calculated_cells] * 4
+    assert [path.name for path in tmp_path.glob("*.json")] == ["shared.json"]
+
+
+def test_result_cache_directory(monkeypatch, tmp_path):
+    monkeypatch.setenv(RESULT_CACHE_DIRECTORY_VARIABLE, str(tmp_path))
+
+    result_cache = create_result_cache()
+    result_cache.put("key", calculated_cells)
+
+    assert (tmp_path / "key.json").exists()
+
+    monkeypatch.delenv(RESULT_CACHE_DIRECTORY_VARIABLE)
+
+    assert create_result_cache().get("key") is None
@@ -1,9 +1,18 @@
+import subprocess
+import sys
 from pathlib import Path
 
 import pytest
 from python_spreadsheets.engine.loaders import _tsv_to_cells, load_from_tsv
+from python_spreadsheets.engine.profiler import FormulaProfiler
 from python_spreadsheets.engine.spreadsheet_calculator import SpreadsheetCalculator
-from python_spreadsheets.engine.types import ErrorValue
+from python_spreadsheets.engine.types import (
+    CellIndex,
+    CellRectangle,
+    Deferred,
+    ErrorKind,
+    ErrorValue,
+)
 
 
 @pytest.fixture
@@ -87,3 +96,370 @@ def test_calculation(spreadsheet_calculator, expected_cells):
         calculated_cell = spreadsheet_calculator.cells[expected_cell_index]
 
         assert calculated_cell.output == expected_cell.input
+
+
+def test_what_if(spreadsheet_calculator):
+    spreadsheet_calculator.add_cell(column="a", row=1, value="2")
+    spreadsheet_calculator.add_cell(column="a", row=2, value="3")
+    spreadsheet_calculator.add_cell(column="b", row=1, value="lambda: a1 * a2")
+    spreadsheet_calculator.add_cell(column="b", row=2, value="lambda: sum(s[a1:a2])")
+
+    scenarios = spreadsheet_calculator.what_if(
+        [{CellIndex("a", 1): 10.0}, {CellIndex("a", 2): 0.5}, {}]
+    )
+
+    assert scenarios == [
+        {CellIndex("b", 1): 30.0, CellIndex("b", 2): 13.0},
+        {CellIndex("b", 1): 1.0, CellIndex("b", 2): 2.5},
+        {CellIndex("b", 1): 6.0, CellIndex("b", 2): 5.0},
+    ]
+
+    spreadsheet_calculator.calculate()
+
+    assert spreadsheet_calculator.get_cell("b", 1).value == 6.0
+
+
+def test_what_if_recalculates_dependent_formulas():
+    profiler = FormulaProfiler()
+    spreadsheet_calculator = SpreadsheetCalculator(
+        columns_number=26, rows_number=100, profiler=profiler
+    )
+    spreadsheet_calculator.add_cell(column="a", row=1, value="2")
+    spreadsheet_calculator.add_cell(column="b", row=1, value="lambda: a1 * 2")
+    spreadsheet_calculator.add_cell(column="b", row=2, value="lambda: sum(s[b1:b1])")
+    spreadsheet_calculator.add_cell(column="c", row=1, value="lambda: 1 + 1")
+    spreadsheet_calculator.add_cell(column="c", row=2, value="lambda: 1 / 0")
+    spreadsheet_calculator.add_cell(column="c", row=3, value="lambda: c2 + a1")
+
+    scenarios = spreadsheet_calculator.what_if(
+        [{CellIndex("a", 1): 10.0}, {CellIndex("b", 1): 1.0}]
+    )
+
+    assert scenarios[0][CellIndex("b", 1)] == 20.0
+    assert scenarios[0][CellIndex("b", 2)] == 20.0
+    assert scenarios[0][CellIndex("c", 1)] == 2.0
+    assert scenarios[0][CellIndex("c", 3)].cause == CellIndex("c", 2)
+    assert CellIndex("b", 1) not in scenarios[1]
+    assert scenarios[1][CellIndex("b", 2)] == 1.0
+    assert scenarios[1][CellIndex("c", 3)].cause == CellIndex("c", 2)
+
+    assert profiler.cells[CellIndex("c", 1)].calls == 1
+    assert profiler.cells[CellIndex("c", 2)].calls == 1
+    assert profiler.cells[CellIndex("b", 1)].calls == 2
+    assert profiler.cells[CellIndex("b", 2)].calls == 3
+
+
+def test_formula_dependencies(spreadsheet_calculator):
+    spreadsheet_calculator.add_cell(
+        column="a", row=1, value="lambda: b1 + sum(s[c1:c2])"
+    )
+    spreadsheet_calculator.add_cell(column="b", row=1, value="lambda: c1 * 10")
+    spreadsheet_calculator.add_cell(column="c", row=1, value="2")
+    spreadsheet_calculator.add_cell(column="c", row=2, value="lambda: c1 + 1")
+
+    spreadsheet_calculator.calculate()
+
+    assert spreadsheet_calculator.get_cell("a", 1).value == 25
+    assert spreadsheet_calculator.get_cell("a", 1).dependencies == [
+        CellIndex("b", 1),
+        CellIndex("c", 1),
+        CellIndex("c", 2),
+    ]
+
+    assert spreadsheet_calculator.get_cell("a", 1).ranges == [
+        CellRectangle(CellIndex("c", 1), CellIndex("c", 2))
+    ]
+
+
+def test_range_dependencies(spreadsheet_calculator):
+    spreadsheet_calculator.add_cell(column="a", row=1, value="lambda: sum(s[b1:c3])")
+    spreadsheet_calculator.add_cell(column="b", row=1, value="1")
+    spreadsheet_calculator.add_cell(column="c", row=3, value="lambda: d1 * 2")
+    spreadsheet_calculator.add_cell(column="d", row=1, value="5")
+    spreadsheet_calculator.add_cell(column="e", row=1, value="lambda: sum(s[d1:d5])")
+    spreadsheet_calculator.add_cell(column="d", row=5, value="lambda: None")
+
+    spreadsheet_calculator.calculate()
+
+    assert spreadsheet_calculator.get_cell("a", 1).value == 11
+    assert spreadsheet_calculator.get_cell("e", 1).output == "Error in dependency d5"
+
+    spreadsheet_calculator.add_cell(column="b", row=3, value="10")
+    result = spreadsheet_calculator.calculate()
+
+    assert result.completed == [CellIndex("a", 1)]
+    assert spreadsheet_calculator.get_cell("a", 1).value == 21
+
+
+def test_range_with_empty_corner():
+    spreadsheet_calculator = SpreadsheetCalculator(
+        columns_number=26, rows_number=1048576
+    )
+    for row in range(1, 4):
+        spreadsheet_calculator.add_cell(column="a", row=row, value=str(row))
+    spreadsheet_calculator.add_cell(
+        column="b", row=1, value="lambda: sum(s[a1:a1048576])"
+    )
+    spreadsheet_calculator.add_cell(
+        column="b", row=2, value="lambda: count(s[c1:d5]) + sum(s[c1:d5])"
+    )
+    spreadsheet_calculator.add_cell(
+        column="b", row=3, value="lambda: sum(s[a1:a1048577])"
+    )
+
+    spreadsheet_calculator.calculate()
+
+    assert spreadsheet_calculator.get_cell("b", 1).value == 6
+    assert spreadsheet_calculator.get_cell("b", 2).value == 0
+    assert spreadsheet_calculator.get_cell("b", 3).output == (
+        "Found forbidden name in lambda body: a1048577"
+    )
+
+    spreadsheet_calculator.add_cell(column="a", row=1048576, value="4")
+    spreadsheet_calculator.calculate()
+
+    assert spreadsheet_calculator.get_cell("b", 1).value == 10
+
+
+def test_shared_range_dependencies_scale_linearly():
+    rows_number = 2000
+    spreadsheet_calculator = SpreadsheetCalculator(
+        columns_number=3, rows_number=rows_number
+    )
+    for row in range(1, rows_number + 1):
+        spreadsheet_calculator.add_cell(column="a", row=row, value=str(row))
+        spreadsheet_calculator.add_cell(
+            column="b", row=row, value=f"lambda: a{row} * 2"
+        )
+        spreadsheet_calculator.add_cell(
+            column="c",
+            row=row,
+            value=f"lambda: vlookup(a{row}, s[a1:b{rows_number}], 2)",
+        )
+
+    result = spreadsheet_calculator.calculate()
+
+    assert len(result.completed) == 2 * rows_number
+    assert spreadsheet_calculator.get_cell("c", rows_number).value == 2 * rows_number
+
+    formula_inputs, range_formulas = spreadsheet_calculator._get_formula_graph()
+    edges = sum(map(len, formula_inputs.values())) + sum(
+        map(len, range_formulas.values())
+    )
+    # формула c ссылается на угол диапазона и на сам диапазон,
+    # диапазон - на формулы столбца b
+    assert len(range_formulas) == 1
+    assert edges == 3 * rows_number
+
+
+def test_bool_formula_values(spreadsheet_calculator):
+    spreadsheet_calculator.add_cell(column="a", row=1, value="TRUE")
+    spreadsheet_calculator.add_cell(column="a", row=2, value="lambda: a1 if a1 else 0")
+    spreadsheet_calculator.add_cell(column="a", row=3, value="lambda: a1 + 1")
+    spreadsheet_calculator.add_cell(column="a", row=4, value="lambda: a3 > 5")
+    spreadsheet_calculator.add_cell(column="b", row=1, value="lambda: count(s[a1:a4])")
+    spreadsheet_calculator.add_cell(column="c", row=1, value="1")
+    spreadsheet_calculator.add_cell(column="c", row=2, value="TRUE")
+    spreadsheet_calculator.add_cell(column="d", row=1, value="lambda: sum(s[c1:c2])")
+    spreadsheet_calculator.add_cell(column="d", row=2, value="lambda: max(s[c1:c2])")
+
+    spreadsheet_calculator.calculate()
+
+    assert spreadsheet_calculator.get_cell("a", 2).output == "TRUE"
+    assert spreadsheet_calculator.get_cell("a", 3).output == "2.0"
+    assert spreadsheet_calculator.get_cell("a", 4).output == "FALSE"
+    assert spreadsheet_calculator.get_cell("b", 1).value == 1
+    assert spreadsheet_calculator.get_cell("d", 1).value == 1.0
+    assert spreadsheet_calculator.get_cell("d", 2).value == 1.0
+
+
+def test_circular_reference(spreadsheet_calculator):
+    spreadsheet_calculator.add_cell(column="a", row=1, value="lambda: b1 + 1")
+    spreadsheet_calculator.add_cell(column="b", row=1, value="lambda: a1 + 1")
+    spreadsheet_calculator.add_cell(column="c", row=1, value="lambda: c1 + 1")
+
+    spreadsheet_calculator.calculate()
+
+    for column in ("a", "b", "c"):
+        cell = spreadsheet_calculator.get_cell(column, 1)
+        assert type(cell.value) == ErrorValue
+        assert cell.output == "Circular reference"
+
+
+def test_error_in_dependency(spreadsheet_calculator):
+    spreadsheet_calculator.add_cell(column="a", row=1, value="lambda: None")
+    spreadsheet_calculator.add_cell(column="a", row=2, value="lambda: a1 + 1")
+
+    spreadsheet_calculator.calculate()
+
+    cell = spreadsheet_calculator.get_cell("a", 2)
+
+    assert type(cell.value) == ErrorValue
+    assert cell.output == "Error in dependency a1"
+    assert cell.value.kind == ErrorKind.RUNTIME
+    assert cell.value.cause == CellIndex("a", 1)
+
+
+@pytest.mark.parametrize(
+    "source, kind",
+    (
+        ("lambda: a1 +", ErrorKind.INVALID_FORMULA),
+        ("lambda: z1000 + 1", ErrorKind.UNKNOWN_NAME),
+        ("lambda: sum(s[a1:a1:2])", ErrorKind.RUNTIME),
+    ),
+)
+def test_error_value_kind(spreadsheet_calculator, source, kind):
+    spreadsheet_calculator.add_cell(column="a", row=1, value="2")
+    spreadsheet_calculator.add_cell(column="b", row=1, value=source)
+
+    spreadsheet_calculator.calculate()
+
+    cell = spreadsheet_calculator.get_cell("b", 1)
+
+    assert type(cell.value) == ErrorValue
+    assert cell.value.kind == kind
+    assert cell.value.cause == CellIndex("b", 1)
+    assert cell.output == cell.value.message
+
+
+def test_error_root_causes(spreadsheet_calculator):
+    spreadsheet_calculator.add_cell(column="a", row=1, value="lambda: None")
+    spreadsheet_calculator.add_cell(column="a", row=2, value="lambda: a1 + 1")
+    spreadsheet_calculator.add_cell(column="a", row=3, value="lambda: a2 + 1")
+    spreadsheet_calculator.add_cell(column="b", row=1, value="lambda: b1 + 1")
+    spreadsheet_calculator.add_cell(column="c", row=1, value="lambda: 1")
+
+    spreadsheet_calculator.calculate()
+
+    assert set(spreadsheet_calculator.errors) == {
+        CellIndex("a", 1),
+        CellIndex("a", 2),
+        CellIndex("a", 3),
+        CellIndex("b", 1),
+    }
+    assert spreadsheet_calculator.get_root_causes() == {
+        CellIndex("a", 1): [CellIndex("a", 2), CellIndex("a", 3)],
+        CellIndex("b", 1): [],
+    }
+
+
+@pytest.fixture
+def model_calculator(spreadsheet_calculator):
+    spreadsheet_calculator.add_cell(column="a", row=1, value="2")
+    spreadsheet_calculator.add_cell(column="a", row=2, value="3")
+    spreadsheet_calculator.add_cell(column="b", row=1, value="lambda: a1 * a1")
+    spreadsheet_calculator.add_cell(column="b", row=2, value="lambda: a2 * 100")
+    spreadsheet_calculator.add_cell(column="c", row=1, value="lambda: b1 + b2")
+    return spreadsheet_calculator
+
+
+def test_sweep(model_calculator):
+    results = model_calculator.sweep(
+        input_index=CellIndex("a", 1),
+        values=[0.0, 1.0, 4.0],
+        target_index=CellIndex("c", 1),
+    )
+
+    assert results == [300.0, 301.0, 316.0]
+    assert model_calculator.get_cell("c", 1).value == 304.0
+
+
+def test_sweep_independent_target(model_calculator):
+    results = model_calculator.sweep(
+        input_index=CellIndex("a", 1), values=[0.0, 1.0], target_index=CellIndex("b", 2)
+    )
+
+    assert results == [300.0, 300.0]
+
+
+def test_goal_seek(model_calculator):
+    value = model_calculator.goal_seek(
+        input_index=CellIndex("a", 1), target_index=CellIndex("c", 1), goal=325.0
+    )
+
+    assert value == pytest.approx(5.0)
+
+
+@pytest.mark.parametrize(
+    "input_index, target_index",
+    ((CellIndex("b", 1), CellIndex("c", 1)), (CellIndex("a", 1), CellIndex("a", 2))),
+)
+def test_sweep_errors(model_calculator, input_index, target_index):
+    with pytest.raises(ValueError):
+        model_calculator.sweep(
+            input_index=input_index, values=[1.0], target_index=target_index
+        )
+
+
+def test_goal_seek_not_converged(model_calculator):
+    with pytest.raises(ValueError):
+        model_calculator.goal_seek(
+            input_index=CellIndex("a", 1), target_index=CellIndex("c", 1), goal=0.0
+        )
+
+
+def test_lookup_not_found(spreadsheet_calculator):
+    spreadsheet_calculator.add_cell(column="a", row=1, value="1")
+    spreadsheet_calculator.add_cell(
+        column="b", row=1, value="lambda: match(2, s[a1:a1])"
+    )
+
+    spreadsheet_calculator.calculate()
+
+    cell = spreadsheet_calculator.get_cell("b", 1)
+
+    assert type(cell.value) == ErrorValue
+    assert cell.output == "Runtime error: Value 2 not found"
+
+
+def test_calculation_with_priority_and_time_budget(spreadsheet_calculator):
+    spreadsheet_calculator.add_cell(column="a", row=1, value="lambda: 1 + 1")
+    spreadsheet_calculator.add_cell(column="b", row=1, value="lambda: c1 * 2")
+    spreadsheet_calculator.add_cell(column="c", row=1, value="lambda: 3 + 3")
+    spreadsheet_calculator.add_cell(column="d", row=1, value="lambda: b1 + a1")
+
+    result = spreadsheet_calculator.calculate(
+        time_budget=0, priority=[CellIndex("b", 1)]
+    )
+
+    assert result.completed == [CellIndex("c", 1)]
+    assert result.pending == [CellIndex("b", 1), CellIndex("a", 1), CellIndex("d", 1)]
+    assert spreadsheet_calculator.get_cell("c", 1).output == "6.0"
+    assert isinstance(spreadsheet_calculator.get_cell("b", 1).output, Deferred)
+
+    result = spreadsheet_calculator.calculate()
+
+    assert result.completed == [CellIndex("a", 1), CellIndex("b", 1), CellIndex("d", 1)]
+    assert result.pending == []
+    assert spreadsheet_calculator.get_cell("d", 1).value == 14
+
+
+def test_recalculation_of_dirty_cells(spreadsheet_calculator):
+    spreadsheet_calculator.add_cell(column="a", row=1, value="lambda: 1 + 1")
+    spreadsheet_calculator.add_cell(column="b", row=1, value="lambda: sum(s[c1:c3])")
+    spreadsheet_calculator.add_cell(column="c", row=1, value="1")
+    spreadsheet_calculator.add_cell(column="c", row=3, value="3")
+
+    result = spreadsheet_calculator.calculate()
+
+    assert result.completed == [CellIndex("a", 1), CellIndex("b", 1)]
+    assert spreadsheet_calculator.get_cell("b", 1).value == 4
+
+    spreadsheet_calculator.add_cell(column="c", row=2, value="5")
+
+    result = spreadsheet_calculator.calculate()
+
+    assert result.completed == [CellIndex("b", 1)]
+    assert spreadsheet_calculator.get_cell("b", 1).value == 9
+
+
+def test_lazy_engine_exports():
+    code = (
+        "import sys\n"
+        "import python_spreadsheets.engine as engine\n"
+        "assert 'python_spreadsheets.engine.loaders' not in sys.modules\n"
+        "assert engine.load_from_tsv.__name__ == 'load_from_tsv'\n"
+        "assert 'python_spreadsheets.engine.loaders' in sys.modules\n"
+        "assert 'starlette' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -7,7 +7,9 @@ from python_spreadsheets.engine.spreadsheet_helpers import (
     RowHelper,
 )
 from python_spreadsheets.engine.types import (
+    BoolCell,
     CellIndex,
+    EmptyCell,
     FormulaCell,
     NumberCell,
     TextCell,
@@ -51,12 +53,31 @@ def test_row_helper(row):
         row_helper.validate_row(row)
 
 
+def test_grid_bounds():
+    cell_helper = CellHelper(columns_number=16384, rows_number=1048576)
+
+    assert cell_helper.create_cell_index(column="xfd", row=1048576) == CellIndex(
+        "xfd", 1048576
+    )
+
+    with pytest.raises(ValueError):
+        cell_helper.create_cell_index(column="xfe", row=1)
+
+    with pytest.raises(ValueError):
+        cell_helper.create_cell_index(column="a", row=1048577)
+
+
 cells_types_pairs = (
     ("lambda: 2 + 2", FormulaCell),
     ("lambda: (2 + 2) * 2", FormulaCell),
     ("123", NumberCell),
     (".1", NumberCell),
     ("100.123", NumberCell),
+    ("0", NumberCell),
+    ("0.0", NumberCell),
+    ("TRUE", BoolCell),
+    ("false", BoolCell),
+    ("", EmptyCell),
     ("lambda ...", TextCell),
     ("Test", TextCell),
     ("def test():\n  print('test')", TextCell),
@@ -105,3 +126,16 @@ def test_invalid_formula_detection(formula):
 
     assert type(cell) == TextCell
     assert cell.output == cell.input == formula
+
+
+@pytest.mark.parametrize(
+    "name, cell_index",
+    (
+        ("a1", CellIndex("a", 1)),
+        ("ab12", CellIndex("ab", 12)),
+        ("a0", None),
+        ("s", None),
+    ),
+)
+def test_parse_cell_index(name, cell_index):
+    assert CellHelper.parse_cell_index(name) == cell_index